@@ -1,109 +1,182 @@
-import os
-import re
-from datetime import datetime
-from pathlib import Path
+import argparse
+import sys
+from datetime import date, datetime, timedelta
 from config import get_obsidian_path
+from vault import VaultSnapshot
+from taskparse import parse_tasks
+from metrics import metrics, configure as configure_metrics
+from locks import lock_resources, LockTimeout, DAILY_NOTES
 
-def get_latest_daily_file(daily_logs_dir):
+# Files this stage reads and writes, for the pipeline scheduler and the run locks
+STAGE_READS = (DAILY_NOTES,)
+STAGE_WRITES = (DAILY_NOTES,)
+
+def get_latest_daily_file(vault):
     """Get the most recent daily file in YYYY-MM-DD.md format."""
-    daily_logs_path = Path(daily_logs_dir)
-    
-    if not daily_logs_path.exists():
-        print(f"Daily logs directory does not exist: {daily_logs_dir}")
+    if not vault.exists():
+        print(f"Daily logs directory does not exist: {vault.obsidian_path}")
         return None
     
-    # Pattern for daily files YYYY-MM-DD.md
-    date_pattern = re.compile(r'^\d{4}-\d{2}-\d{2}\.md$')
-    
-    daily_files = []
-    for file in daily_logs_path.iterdir():
-        if file.is_file() and date_pattern.match(file.name):
-            daily_files.append(file)
-    
-    if not daily_files:
+    latest_file = vault.latest_daily_file()
+    if not latest_file:
         print("No daily files found")
         return None
     
-    # Sort files by date (newest first) and return the latest
-    daily_files.sort(reverse=True)
-    return daily_files[0]
+    return latest_file
 
 def remove_completed_tasks(lines):
     """Remove lines that contain completed tasks (- [x])."""
-    filtered_lines = []
-    
-    for line in lines:
-        stripped_line = line.lstrip()
-        # Skip lines that are completed tasks
-        if re.match(r'^- \[x\]', stripped_line):
-            continue
-        filtered_lines.append(line)
+    return remove_completed_from_tree(parse_tasks(lines))
+
+def remove_completed_from_tree(tree):
+    """Return the tree's lines without the completed task lines."""
+    completed_lines = tree.checked_line_numbers()
+    return [line for line_no, line in enumerate(tree.lines) if line_no not in completed_lines]
+
+# What to do when a daily file that would be created already exists
+EXISTING_POLICIES = ('ask', 'overwrite', 'skip')
+
+def should_write_existing(file_path, policy):
+    """Decide whether to overwrite an existing daily file under the given policy."""
+    if policy is None:
+        # Only prompt when someone can answer; unattended runs never overwrite
+        policy = 'ask' if sys.stdin.isatty() else 'skip'
     
-    return filtered_lines
+    if policy == 'overwrite':
+        return True
+    if policy == 'ask':
+        user_input = input(f"{file_path.name} already exists. Overwrite? (y/n): ")
+        return user_input.lower() == 'y'
+    return False
 
-def create_todays_file(daily_logs_dir, content):
-    """Create today's daily file with the filtered content."""
-    today = datetime.now().strftime('%Y-%m-%d')
-    today_file_path = Path(daily_logs_dir) / f"{today}.md"
+def create_daily_file(vault, day, content, policy=None):
+    """Create the daily file for a YYYY-MM-DD date with the filtered content."""
+    file_path = vault.daily_file_path(day)
     
-    # Check if today's file already exists
-    if today_file_path.exists():
-        user_input = input(f"Today's file ({today}.md) already exists. Overwrite? (y/n): ")
-        if user_input.lower() != 'y':
-            print("Aborted. Today's file was not created.")
-            return None
+    # Check if the file already exists
+    if vault.file_exists(file_path) and not should_write_existing(file_path, policy):
+        print(f"Skipped {file_path.name}: it already exists.")
+        return None
     
     try:
-        with open(today_file_path, 'w', encoding='utf-8') as file:
-            file.writelines(content)
-        print(f"Created today's file: {today_file_path}")
-        return today_file_path
+        vault.write_text(file_path, ''.join(content))
+        print(f"Created daily file: {file_path}")
+        return file_path
     except Exception as e:
-        print(f"Error creating today's file: {e}")
+        print(f"Error creating {file_path.name}: {e}")
         return None
 
-def process_latest_daily_file(daily_logs_dir):
-    """Process the latest daily file and create today's file without completed tasks."""
+def open_lines_from_tree(tree):
+    """Return the lines left after removing completed tasks, and the original line count."""
+    return remove_completed_from_tree(tree), len(tree.lines)
+
+def create_todays_file(vault, content, policy=None):
+    """Create today's daily file with the filtered content."""
+    today = datetime.now().strftime('%Y-%m-%d')
+    return create_daily_file(vault, today, content, policy)
+
+def missing_days(latest_day, today):
+    """Return the YYYY-MM-DD dates after latest_day up to and including today."""
+    day = date.fromisoformat(latest_day) + timedelta(days=1)
+    end = date.fromisoformat(today)
+    days = []
+    while day <= end:
+        days.append(day.isoformat())
+        day += timedelta(days=1)
+    return days
+
+def process_latest_daily_file(vault, catch_up=False, policy=None):
+    """Process the latest daily file and create today's file without completed tasks.
+    
+    With catch_up, every day missed since the latest daily file gets a file
+    too, all built from the same filtered content.
+    """
     
     # Get the latest daily file
-    latest_file = get_latest_daily_file(daily_logs_dir)
+    latest_file = get_latest_daily_file(vault)
     
     if not latest_file:
         print("No daily files found to process")
-        return
+        return False
     
     print(f"Processing latest file: {latest_file.name}")
     
     try:
         # Read the latest file
-        with open(latest_file, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-        
-        print(f"Original file has {len(lines)} lines")
-        
-        # Remove completed tasks
-        filtered_lines = remove_completed_tasks(lines)
+        with metrics.file_span(latest_file):
+            # Remove completed tasks
+            filtered_lines, line_count = vault.cached_parse(latest_file, 'open_lines', open_lines_from_tree)
+            
+            print(f"Original file has {line_count} lines")
         
-        completed_count = len(lines) - len(filtered_lines)
+        completed_count = line_count - len(filtered_lines)
+        metrics.count('items_extracted', completed_count)
         print(f"Removed {completed_count} completed task lines")
         print(f"Remaining {len(filtered_lines)} lines for today's file")
         
-        # Create today's file
-        if filtered_lines:
-            create_todays_file(daily_logs_dir, filtered_lines)
-        else:
+        if not filtered_lines:
             print("No tasks remaining after filtering completed tasks")
+        elif catch_up:
+            # Fill the gap since the latest file; the filtered content is built once
+            today = datetime.now().strftime('%Y-%m-%d')
+            days = missing_days(latest_file.stem, today)
+            if not days:
+                # Today's file exists already; rewriting it from its filtered copy would drop its completed tasks
+                print(f"Daily files are up to date: {latest_file.name} is the latest")
+            elif len(days) > 1:
+                print(f"Catching up {len(days)} days: {days[0]} to {days[-1]}")
+            for day in days:
+                create_daily_file(vault, day, filtered_lines, policy)
+        else:
+            # Create today's file
+            create_todays_file(vault, filtered_lines, policy)
             
     except Exception as e:
         print(f"Error processing file {latest_file}: {e}")
+        return False
+    
+    return True
+
+def add_existing_arguments(parser):
+    """Add the --catch-up and --overwrite/--skip options to an argparse parser."""
+    parser.add_argument('--catch-up', action='store_true',
+                        help="also create a daily file for every day missed since the latest one")
+    existing = parser.add_mutually_exclusive_group()
+    existing.add_argument('--overwrite', dest='existing', action='store_const', const='overwrite',
+                          help="overwrite daily files that already exist")
+    existing.add_argument('--skip', dest='existing', action='store_const', const='skip',
+                          help="leave daily files that already exist alone")
+    existing.add_argument('--ask', dest='existing', action='store_const', const='ask',
+                          help="ask before overwriting (default when run from a terminal)")
 
 def main():
+    parser = argparse.ArgumentParser(description="Create today's daily file from the latest one without completed tasks")
+    add_existing_arguments(parser)
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="save a JSON report of timings and I/O counters (or set TASK_MANAGER_METRICS)")
+    parser.add_argument('--profile', metavar='DIR',
+                        help="save cProfile output to DIR (or set TASK_MANAGER_PROFILE)")
+    args = parser.parse_args()
+    
     # Configuration - Load from environment file
     daily_logs_directory = get_obsidian_path()
     
     # Process the latest daily file
-    process_latest_daily_file(daily_logs_directory)
+    configure_metrics(args.metrics, args.profile)
+    try:
+        with lock_resources(daily_logs_directory, STAGE_READS + STAGE_WRITES):
+            vault = VaultSnapshot(daily_logs_directory)
+            with metrics.stage('actrak'):
+                success = (process_latest_daily_file(vault, catch_up=args.catch_up, policy=args.existing)
+                           and vault.flush())
+    except LockTimeout as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    metrics.write_report()
     
+    if not success:
+        print("\n❌ Processing failed!")
+        sys.exit(1)
     print("\nProcessing complete!")
 
 if __name__ == "__main__":
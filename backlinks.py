@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Backlinks
+Lists every reference to a note from the daily notes (archived ones
+included): the date, line, whether the task is checked and its
+"parent - task" path, e.g. everything that mentioned Project X:
+
+    python backlinks.py "Project X" --since 2025-01-01
+
+Answered from the link index, which is refreshed first for daily notes
+that changed since the last run.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from config import get_obsidian_path
+from vault import VaultSnapshot
+from daily_archive import DailyArchive
+from link_index import NOT_A_TASK
+
+
+def print_links(links):
+    for link in links:
+        mark = {NOT_A_TASK: '   ', 0: '[ ]', 1: '[x]'}[link['checked']]
+        opportunity = link['opportunity']
+        under = f"  (under [[{opportunity}]])" if opportunity and opportunity != link['link'] else ""
+        print(f"{link['date']}  line {link['line'] + 1:<4} {mark} {link['path']}{under}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the daily notes and tasks that link to a note")
+    parser.add_argument('note', help="the note name, e.g. \"Project X\" or [[Project X]]")
+    parser.add_argument('--since', metavar='YYYY-MM-DD', help="only daily notes on or after this date")
+    parser.add_argument('--until', metavar='YYYY-MM-DD', help="only daily notes on or before this date")
+    state = parser.add_mutually_exclusive_group()
+    state.add_argument('--checked', dest='checked', action='store_const', const=True,
+                       help="only links on checked tasks")
+    state.add_argument('--open', dest='checked', action='store_const', const=False,
+                       help="only links on open tasks")
+    parser.add_argument('--limit', type=int, help="show at most this many links")
+    parser.add_argument('--json', action='store_true', help="print the links as JSON")
+    parser.add_argument('--rebuild', action='store_true', help="re-read every daily note first")
+    args = parser.parse_args()
+
+    # Configuration - Load from environment file
+    obsidian_path = get_obsidian_path()
+
+    # Verify obsidian directory exists
+    if not os.path.exists(obsidian_path):
+        print(f"❌ Obsidian directory not found: {obsidian_path}")
+        sys.exit(1)
+
+    vault = VaultSnapshot(obsidian_path)
+    links = vault.link_index
+    if args.rebuild:
+        links.notes.clear()
+
+    start = time.perf_counter()
+    updated = links.refresh(vault, DailyArchive(vault))
+    links.save()
+    if updated:
+        print(f"🔗 Indexed links in {updated} daily notes in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+    start = time.perf_counter()
+    matches = links.backlinks(args.note, args.since, args.until, args.checked)
+    elapsed = (time.perf_counter() - start) * 1000
+    if args.limit:
+        matches = matches[:args.limit]
+
+    if args.json:
+        print(json.dumps(matches, indent=2, ensure_ascii=False))
+    else:
+        print_links(matches)
+    notes = len({match['date'] for match in matches})
+    print(f"🔎 {len(matches)} links in {notes} daily notes in {elapsed:.1f}ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
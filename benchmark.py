@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark Harness
+Times the task parsers and each script end to end against a synthetic
+vault from vaultgen.py (or a copy of an existing vault) and saves the
+results as JSON. Pass --baseline to compare against an earlier results
+file and flag regressions.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from vaultgen import add_generator_arguments, generator_options, generate_vault
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+SCRIPTS = ['deeplogging.py', 'task_logger.py', 'oplog.py', 'actrak.py', 'pipeline.py']
+
+
+def summarize(timings):
+    return {
+        'repeats': len(timings),
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'max': max(timings),
+    }
+
+
+def time_call(function, repeats):
+    """Time repeated calls of a function, with its console output suppressed"""
+    timings = []
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+def benchmark_parsers(vault_path, repeats):
+    """Time the line parsers on every daily note and the tracker parser on the tracker"""
+    os.environ['OBSIDIAN_VAULT_PATH'] = str(vault_path)
+    from vault import VaultSnapshot
+    from deeplogging import TaskTracker
+    from task_logger import TaskLogger
+    import oplog
+    import actrak
+
+    vault = VaultSnapshot(vault_path)
+    daily_lines = [vault.read_lines(path) for path in vault.daily_files()]
+    tracker = TaskTracker(vault_path, vault)
+
+    def parse_tracker():
+        TaskLogger(vault_path, VaultSnapshot(vault_path)).parse_tracker_file()
+
+    return {
+        'parse_markdown_hierarchy': time_call(
+            lambda: [tracker.parse_markdown_hierarchy(lines) for lines in daily_lines], repeats),
+        'parse_completed_activities': time_call(
+            lambda: [oplog.parse_completed_activities(lines) for lines in daily_lines], repeats),
+        'remove_completed_tasks': time_call(
+            lambda: [actrak.remove_completed_tasks(lines) for lines in daily_lines], repeats),
+        'parse_tracker_file': time_call(parse_tracker, repeats),
+    }
+
+
+def benchmark_scripts(vault_path, repeats, scripts):
+    """Time each script as a separate process on a fresh copy of the vault"""
+    results = {}
+
+    for script in scripts:
+        timings = []
+        for _ in range(repeats):
+            with tempfile.TemporaryDirectory() as work_dir:
+                vault_copy = Path(work_dir) / 'vault'
+                shutil.copytree(vault_path, vault_copy)
+                env = dict(os.environ, OBSIDIAN_VAULT_PATH=str(vault_copy))
+
+                start = time.perf_counter()
+                completed = subprocess.run([sys.executable, str(SCRIPT_DIR / script)], env=env, cwd=SCRIPT_DIR,
+                                           input='n\n', text=True,
+                                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                timings.append(time.perf_counter() - start)
+
+            if completed.returncode != 0:
+                print(f"⚠️  {script} exited with {completed.returncode}: {completed.stderr.strip()[-200:]}")
+
+        results[f"script:{script}"] = summarize(timings)
+
+    return results
+
+
+def compare_to_baseline(report, baseline, tolerance):
+    """Print the change against a baseline report and return the regressed benchmarks"""
+    regressions = []
+    print(f"\n📊 Compared to baseline from {baseline.get('meta', {}).get('timestamp', 'unknown')}:")
+
+    for name, result in report['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if not base or not base['median']:
+            print(f"   • {name}: no baseline")
+            continue
+
+        change = result['median'] / base['median'] - 1
+        flag = ""
+        if change > tolerance:
+            flag = "  ❌ regression"
+            regressions.append(name)
+        print(f"   • {name}: {base['median'] * 1000:.1f}ms → {result['median'] * 1000:.1f}ms ({change:+.1%}){flag}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the task manager on a synthetic vault")
+    parser.add_argument('--vault', help="benchmark a copy of this vault instead of generating one")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', default='bench_results.json', help="where to save the JSON results")
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="median slowdown that counts as a regression (default: 0.10 = 10%%)")
+    parser.add_argument('--skip-scripts', action='store_true', help="only run the parser benchmarks")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.vault:
+            vault_path = Path(args.vault)
+            vault_params = {'vault': str(vault_path)}
+        else:
+            vault_path = Path(work_dir) / 'vault'
+            vault_params = generator_options(args)
+            generate_vault(vault_path, **vault_params)
+
+        print("⏱️  Timing parsers...")
+        benchmarks = benchmark_parsers(vault_path, args.repeats)
+        if not args.skip_scripts:
+            print("⏱️  Timing scripts end to end...")
+            benchmarks.update(benchmark_scripts(vault_path, args.repeats, SCRIPTS))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeats': args.repeats,
+            'vault': vault_params,
+        },
+        'benchmarks': benchmarks,
+    }
+
+    for name, result in benchmarks.items():
+        print(f"   • {name}: median {result['median'] * 1000:.1f}ms (min {result['min'] * 1000:.1f}ms)")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare_to_baseline(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Checkpoint Manifest
+Records path, mtime, size and content hash for every file a stage has
+processed, so later runs only have to look at new or changed files
+"""
+
+import json
+import os
+from pathlib import Path
+from vault import get_state_path
+
+
+class CheckpointManifest:
+    def __init__(self, vault, filename):
+        self.vault = vault
+        self.manifest_file = get_state_path(vault.obsidian_path, filename)
+        self.entries = {}  # {relative path: {mtime_ns, size, hash}}
+        self.load()
+
+    def load(self):
+        """Load the manifest from the vault state folder"""
+        if not self.vault.file_exists(self.manifest_file):
+            return
+
+        try:
+            self.entries = json.loads(self.vault.read_text(self.manifest_file))
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable checkpoint {self.manifest_file.name}: {e}")
+            self.entries = {}
+
+    def clear(self):
+        """Forget every recorded file so the next pass is a full rebuild"""
+        self.entries = {}
+
+    def _key(self, path):
+        return Path(path).relative_to(self.vault.obsidian_path).as_posix()
+
+    def is_current(self, path):
+        """Check if a file is unchanged since it was last recorded"""
+        path = Path(path)
+        entry = self.entries.get(self._key(path))
+        if entry is None or not path.exists():
+            return False
+
+        stat = os.stat(path)
+        if stat.st_mtime_ns == entry.get('mtime_ns') and stat.st_size == entry.get('size'):
+            return True
+
+        # Touched but not edited (e.g. a sync tool rewrote it): compare content
+        state = self.vault.file_state(path)
+        if state[2] == entry['hash']:
+            self.record(path, state)
+            return True
+
+        return False
+
+    def record(self, path, state=None):
+        """Record a processed file
+
+        state is its (mtime_ns, size, content hash) from before it was read,
+        e.g. vault.file_state(path); taking it afterwards could pair a newer
+        stat with the hash of older content and hide a mid-run edit.
+        """
+        path = Path(path)
+        if state is None:
+            if not path.exists():
+                return
+            state = self.vault.file_state(path)
+
+        mtime_ns, size, digest = state
+        self.entries[self._key(path)] = {
+            'mtime_ns': mtime_ns,
+            'size': size,
+            'hash': digest,
+        }
+
+    def is_current_digest(self, path, digest):
+        """Check if a file known only by its content hash (an archived note) was processed in that state"""
+        entry = self.entries.get(self._key(path))
+        return entry is not None and entry.get('hash') == digest
+
+    def record_digest(self, path, digest):
+        """Record a processed file that is no longer on disk by its content hash"""
+        entry = self.entries.setdefault(self._key(path), {})
+        entry['hash'] = digest
+
+    def prune(self, paths):
+        """Drop entries for files that are no longer in the vault"""
+        keep = {self._key(path) for path in paths}
+        self.entries = {key: entry for key, entry in self.entries.items() if key in keep}
+
+    def save(self):
+        """Stage the manifest to be written once the rest of the run's output is on disk"""
+        self.vault.write_state(self.manifest_file, json.dumps(self.entries, indent=2, sort_keys=True))
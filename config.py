@@ -7,8 +7,16 @@ import os
 from pathlib import Path
 
 
+_env_loaded = False
+
+
 def load_env_file():
-    """Load environment variables from .env file"""
+    """Load environment variables from .env file (once per process)"""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    
     env_file = Path(__file__).parent / '.env'
     
     if not env_file.exists():
@@ -35,8 +43,8 @@ def load_env_file():
                     elif value.startswith("'") and value.endswith("'"):
                         value = value[1:-1]
                     
-                    # Set environment variable
-                    os.environ[key] = value
+                    # Set environment variable (variables already set in the environment win)
+                    os.environ.setdefault(key, value)
     
     except Exception as e:
         print(f"Error loading .env file: {e}")
@@ -65,6 +73,25 @@ def get_obsidian_path():
     return str(path)
 
 
+def get_setting(key, default=None):
+    """Get an optional setting from the environment or .env file"""
+    load_env_file()
+    return os.getenv(key, default)
+
+
+def get_float_setting(key, default):
+    """Get an optional numeric setting, falling back to the default if it isn't a number"""
+    value = get_setting(key)
+    if value is None:
+        return default
+    
+    try:
+        return float(value)
+    except ValueError:
+        print(f"Warning: {key}={value!r} is not a number, using {default}")
+        return default
+
+
 # For backward compatibility, you can also import the path directly
 try:
     OBSIDIAN_PATH = get_obsidian_path()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Daily Note Archive
+Packs daily notes older than a cutoff into one zip per month in the
+Daily Archive folder (e.g. Daily Archive/2023-01.zip), so the vault root
+and every daily note listing only hold recent notes. A small index in
+the vault state folder records each archived note's content hash.
+
+Archived notes are read back one at a time with streaming decompression,
+so oplog's full-history passes still see every note without the
+archive ever being unpacked to disk.
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from datetime import date, timedelta
+from config import get_obsidian_path, get_float_setting
+from vault import VaultSnapshot, get_state_path
+from daily_index import DAILY_FILE_PATTERN
+from parse_cache import content_hash
+from locks import lock_resources, LockTimeout, DAILY_NOTES
+
+
+ARCHIVE_DIR_NAME = "Daily Archive"
+ARCHIVE_INDEX_FILE = 'daily_archive.json'
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+
+ARCHIVE_NAME_PATTERN = re.compile(r'^(\d{4}-\d{2})\.zip$')
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def decode_note(data):
+    """Decode a note's bytes the way a text-mode read would (UTF-8, universal newlines)"""
+    return io.TextIOWrapper(io.BytesIO(data), encoding='utf-8').read()
+
+
+class DailyArchive:
+    def __init__(self, vault):
+        self.vault = vault
+        self.archive_dir = vault.obsidian_path / ARCHIVE_DIR_NAME
+        self.index_file = get_state_path(vault.obsidian_path, ARCHIVE_INDEX_FILE)
+        self._months = None  # {YYYY-MM: {YYYY-MM-DD: content hash}}
+
+    def archive_path(self, month):
+        return self.archive_dir / f"{month}.zip"
+
+    @property
+    def months(self):
+        """Archived notes by month with their content hashes, from the index"""
+        if self._months is None:
+            try:
+                self._months = json.loads(self.vault.read_text(self.index_file))
+            except Exception:
+                self._months = self._scan_archives()
+        return self._months
+
+    def _scan_archives(self):
+        months = {}
+        if self.archive_dir.is_dir():
+            with os.scandir(self.archive_dir) as entries:
+                for entry in entries:
+                    match = ARCHIVE_NAME_PATTERN.match(entry.name)
+                    if not match or not entry.is_file():
+                        continue
+                    with zipfile.ZipFile(entry.path) as bundle:
+                        months[match.group(1)] = {name[:-3]: content_hash(decode_note(bundle.read(name)))
+                                                  for name in bundle.namelist() if DAILY_FILE_PATTERN.match(name)}
+        return months
+
+    def _save_index(self):
+        self.vault.write_text(self.index_file, json.dumps(self.months, indent=2, sort_keys=True))
+        if not self.vault.flush():
+            raise ArchiveError(f"could not save {self.index_file.name}")
+
+    def dates(self):
+        """Every archived note's date, oldest first"""
+        return sorted(day for notes in self.months.values() for day in notes)
+
+    def note_hash(self, day):
+        """Content hash of an archived note, or None if the date isn't archived"""
+        return self.months.get(day[:7], {}).get(day)
+
+    def iter_notes(self, days=None, newest_first=False):
+        """Yield (date, lines) for archived notes, decompressing one note at a time"""
+        wanted = None if days is None else set(days)
+        for month in sorted(self.months, reverse=newest_first):
+            month_days = [day for day in sorted(self.months[month], reverse=newest_first)
+                          if wanted is None or day in wanted]
+            if not month_days:
+                continue
+            with zipfile.ZipFile(self.archive_path(month)) as bundle:
+                for day in month_days:
+                    with bundle.open(f"{day}.md") as member:
+                        yield day, io.TextIOWrapper(member, encoding='utf-8').readlines()
+
+    def archive(self, before):
+        """Move the daily notes dated before a YYYY-MM-DD date into their month's zip
+
+        The newest daily note always stays, since the other scripts start
+        from it. Returns the number of notes archived.
+        """
+        dates = self.vault.daily_index.dates[:-1]
+        by_month = {}
+        for day in dates:
+            if day >= before:
+                break
+            by_month.setdefault(day[:7], []).append(day)
+
+        moved = 0
+        for month, days in by_month.items():
+            self._write_month(month, days)
+            moved += len(days)
+            print(f"📦 {month}: archived {len(days)} notes")
+        return moved
+
+    def _write_month(self, month, days):
+        """Rewrite a month's zip with its archived notes plus new ones, then delete the originals"""
+        path = self.archive_path(month)
+        members = {}  # {name: (ZipInfo, bytes)}
+        if path.exists():
+            with zipfile.ZipFile(path) as bundle:
+                for info in bundle.infolist():
+                    members[info.filename] = (info, bundle.read(info))
+
+        # A note in the vault root replaces an archived copy of the same date
+        for day in days:
+            note = self.vault.daily_file_path(day)
+            mtime = max(os.stat(note).st_mtime, 315532800)  # zip dates start in 1980
+            info = zipfile.ZipInfo(note.name, date_time=time.localtime(mtime)[:6])
+            with open(note, 'rb') as f:
+                members[note.name] = (info, f.read())
+
+        self.archive_dir.mkdir(exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            with zipfile.ZipFile(temp_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as bundle:
+                for name in sorted(members):
+                    info, data = members[name]
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    bundle.writestr(info, data)
+
+            # Nothing is deleted unless the new zip reads back byte for byte
+            with zipfile.ZipFile(temp_path) as bundle:
+                if any(bundle.read(name) != data for name, (_, data) in members.items()):
+                    raise ArchiveError(f"{path.name} did not read back correctly")
+            with open(temp_path, 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+        self.months[month] = {name[:-3]: content_hash(decode_note(data))
+                              for name, (_, data) in sorted(members.items()) if DAILY_FILE_PATTERN.match(name)}
+        self._save_index()
+
+        for day in days:
+            note = self.vault.daily_file_path(day)
+            os.remove(note)
+            self.vault.invalidate(note)
+
+    def restore(self, month):
+        """Unpack a month's notes back into the vault root and remove its zip"""
+        path = self.archive_path(month)
+        if month not in self.months or not path.exists():
+            print(f"❌ {month} is not archived")
+            return False
+
+        with zipfile.ZipFile(path) as bundle:
+            infos = bundle.infolist()
+            existing = [info.filename for info in infos if (self.vault.obsidian_path / info.filename).exists()]
+            if existing:
+                print(f"❌ Not restoring {month}: {', '.join(existing)} already in the vault")
+                return False
+
+            for info in infos:
+                note = self.vault.obsidian_path / info.filename
+                with open(note, 'wb') as f:
+                    f.write(bundle.read(info))
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                os.utime(note, (mtime, mtime))
+                self.vault.invalidate(note)
+
+        os.remove(path)
+        del self.months[month]
+        self._save_index()
+        print(f"📂 {month}: restored {len(infos)} notes")
+        return True
+
+
+def archive_cutoff(days_old):
+    """The YYYY-MM-DD date notes have to be older than to be archived"""
+    return (date.today() - timedelta(days=days_old)).isoformat()
+
+
+def print_archive(archive):
+    total_notes = total_bytes = 0
+    for month in sorted(archive.months):
+        path = archive.archive_path(month)
+        size = path.stat().st_size if path.exists() else 0
+        count = len(archive.months[month])
+        total_notes += count
+        total_bytes += size
+        print(f"{month}  {count:3d} notes  {size / 1024:8.1f} KB")
+    print(f"🗄️  {total_notes} archived notes in {len(archive.months)} months ({total_bytes / 1024:.1f} KB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack old daily notes into monthly zip archives")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    archive_parser = subparsers.add_parser('archive', help="archive daily notes older than a number of days")
+    archive_parser.add_argument('--older-than', type=int, metavar='DAYS',
+                                help="archive notes older than this many days "
+                                     f"(default: DAILY_ARCHIVE_AFTER_DAYS setting or {DEFAULT_ARCHIVE_AFTER_DAYS})")
+    subparsers.add_parser('list', help="list the archived months")
+    restore_parser = subparsers.add_parser('restore', help="unpack a month back into the vault")
+    restore_parser.add_argument('month', metavar='YYYY-MM')
+    args = parser.parse_args()
+
+    # Configuration - Load from environment file
+    obsidian_path = get_obsidian_path()
+
+    # Verify obsidian directory exists
+    if not os.path.exists(obsidian_path):
+        print(f"❌ Obsidian directory not found: {obsidian_path}")
+        sys.exit(1)
+
+    if args.command == 'list':
+        print_archive(DailyArchive(VaultSnapshot(obsidian_path)))
+        return
+
+    try:
+        with lock_resources(obsidian_path, [DAILY_NOTES]):
+            archive = DailyArchive(VaultSnapshot(obsidian_path))
+            if args.command == 'restore':
+                success = archive.restore(args.month)
+            else:
+                days_old = args.older_than
+                if days_old is None:
+                    days_old = int(get_float_setting('DAILY_ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS))
+                moved = archive.archive(archive_cutoff(days_old))
+                print(f"✨ Archived {moved} daily notes older than {days_old} days")
+                success = True
+    except (LockTimeout, ArchiveError, OSError, zipfile.BadZipFile) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if not success:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
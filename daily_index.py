@@ -0,0 +1,106 @@
+"""
+Daily Note Index
+Sorted list of the vault's YYYY-MM-DD.md dates, built with a single
+os.scandir pass and cached on disk. The cache is keyed by the vault
+directory's mtime, which changes whenever a file is added, removed or
+renamed, so an unchanged directory is never listed again.
+"""
+
+import bisect
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+
+DAILY_FILE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}\.md$')
+
+# Directory mtimes this close to "now" may still change within the same
+# timestamp tick (coarse filesystem clocks), so they are not cached
+RACY_MTIME_SECONDS = 2
+
+
+class DailyNoteIndex:
+    def __init__(self, obsidian_path, cache_file=None):
+        self.obsidian_path = Path(obsidian_path)
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.dates = []  # sorted oldest first, e.g. '2025-01-15'
+        self.rescanned = False
+
+    def load(self):
+        """Load the index from the cache, rescanning only if the directory changed"""
+        try:
+            dir_mtime_ns = os.stat(self.obsidian_path).st_mtime_ns
+        except OSError:
+            self.dates = []
+            return self
+
+        cached = self._read_cache()
+        if cached is not None and cached.get('dir_mtime_ns') == dir_mtime_ns:
+            self.dates = cached['dates']
+            return self
+
+        self.dates = self.scan()
+        self.rescanned = True
+        if time.time() - dir_mtime_ns / 1e9 > RACY_MTIME_SECONDS:
+            self._write_cache(dir_mtime_ns)
+        return self
+
+    def scan(self):
+        """List the vault directory once and return the sorted daily note dates"""
+        dates = []
+        with os.scandir(self.obsidian_path) as entries:
+            for entry in entries:
+                if DAILY_FILE_PATTERN.match(entry.name) and entry.is_file():
+                    dates.append(entry.name[:-3])
+        dates.sort()
+        return dates
+
+    def _read_cache(self):
+        if self.cache_file is None or not self.cache_file.exists():
+            return None
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _write_cache(self, dir_mtime_ns):
+        if self.cache_file is None:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump({'dir_mtime_ns': dir_mtime_ns, 'dates': self.dates}, f)
+        except Exception as e:
+            print(f"⚠️  Could not save daily note index: {e}")
+
+    def add(self, date):
+        """Add a date for a daily note created during this run"""
+        position = bisect.bisect_left(self.dates, date)
+        if position == len(self.dates) or self.dates[position] != date:
+            self.dates.insert(position, date)
+
+    def discard(self, date):
+        """Remove a date whose daily note was deleted"""
+        position = bisect.bisect_left(self.dates, date)
+        if position < len(self.dates) and self.dates[position] == date:
+            del self.dates[position]
+
+    def latest(self):
+        """Return the newest date, or None"""
+        return self.dates[-1] if self.dates else None
+
+    def since(self, date):
+        """Return the dates on or after date, oldest first"""
+        return self.dates[bisect.bisect_left(self.dates, date):]
+
+    def between(self, start, end):
+        """Return the dates from start to end inclusive, oldest first"""
+        return self.dates[bisect.bisect_left(self.dates, start):bisect.bisect_right(self.dates, end)]
+
+    def before(self, date):
+        """Return the newest date strictly before date, or None"""
+        position = bisect.bisect_left(self.dates, date)
+        return self.dates[position - 1] if position else None
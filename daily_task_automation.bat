@@ -1,7 +1 @@
-python deeplogging.py
-
-python task_logger.py
-
-python oplog.py
-
-python actrak.py
\ No newline at end of file
+python pipeline.py
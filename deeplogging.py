@@ -6,74 +6,102 @@ Converts checked items to unchecked and includes parent hierarchy
 *** PRESERVES ORIGINAL DAILY FILES - DOES NOT MODIFY THEM ***
 """
 
+import argparse
+import json
 import os
-import re
 from datetime import datetime
 from pathlib import Path
 import sys
 from config import get_obsidian_path
+from vault import VaultSnapshot, get_state_path
+from taskparse import parse_tasks
+from metrics import metrics, configure as configure_metrics
+from entry_index import LoggedEntryIndex, entry_key
+from logger_files import LoggerLayout
+from locks import lock_resources, LockTimeout, DAILY_NOTES, TRACKER, LOGGER
+
+# Files this stage reads and writes, for the pipeline scheduler and the run locks
+STAGE_READS = (DAILY_NOTES, TRACKER, LOGGER)
+STAGE_WRITES = (TRACKER,)
+
+# Fingerprints of the checked lines seen by the last run, for diffing the next one
+LINE_STATE_FILE = 'deeplogging_lines.json'
 
 
 class TaskTracker:
-    def __init__(self, obsidian_path):
+    def __init__(self, obsidian_path, vault=None):
         self.obsidian_path = Path(obsidian_path)
         self.tracker_file = self.obsidian_path / "00 Tracker.md"
+        self.vault = vault if vault is not None else VaultSnapshot(obsidian_path)
+        self.logger = LoggerLayout(self.vault)
+        self._entry_index = None
+        self.line_state_file = get_state_path(self.obsidian_path, LINE_STATE_FILE)
         
     def find_latest_date_file(self):
         """Find the latest YYYY-MM-DD.md file"""
-        date_pattern = re.compile(r'^\d{4}-\d{2}-\d{2}\.md$')
-        date_files = []
-        
-        for file in os.listdir(self.obsidian_path):
-            if date_pattern.match(file):
-                date_files.append(file)
-        
-        if not date_files:
-            return None
-        
-        date_files.sort(reverse=True)
-        return date_files[0]
+        latest_file = self.vault.latest_daily_file()
+        return latest_file.name if latest_file else None
     
     def parse_markdown_hierarchy(self, lines):
         """Parse markdown lines and extract hierarchy with checked items"""
+        return self.extract_checked_items(parse_tasks(lines))
+    
+    def extract_checked_items(self, tree):
+        """Build "parent - child - task" text for each checked task from its unchecked parents"""
         checked_items = []
-        parent_stack = []
         
-        for line in lines:
-            line_content = line.rstrip()
-            
-            if not line_content:
+        for node in tree.nodes:
+            if not node.checked or not node.text:
                 continue
             
-            # Calculate indentation level
-            indent_level = 0
-            if line_content.startswith('\t'):
-                indent_level = len(line_content) - len(line_content.lstrip('\t'))
-            elif line_content.startswith('    '):
-                indent_level = (len(line_content) - len(line_content.lstrip(' '))) // 4
-            
-            content = line_content.strip()
-            
-            # Check for checkbox item
-            checkbox_match = re.match(r'^- \[([ x])\] (.+)$', content)
-            if checkbox_match:
-                is_checked = checkbox_match.group(1) == 'x'
-                task_text = checkbox_match.group(2)
-                
-                # Adjust parent stack to current level
-                parent_stack = parent_stack[:indent_level]
-                
-                if is_checked:
-                    # Build parent hierarchy
-                    parent_hierarchy = ' - '.join(parent_stack) if parent_stack else ''
-                    full_text = f"{parent_hierarchy} - {task_text}" if parent_hierarchy else task_text
-                    checked_items.append(full_text)
-                else:
-                    # Add unchecked item to parent stack
-                    parent_stack.append(task_text)
+            parents = [parent.text for parent in node.ancestors() if not parent.checked and parent.text]
+            parents.append(node.text)
+            checked_items.append(' - '.join(parents))
         
         return checked_items
     
+    def entry_index(self):
+        """Index of items already in the tracker or logger, built once per run"""
+        if self._entry_index is None:
+            self._entry_index = LoggedEntryIndex(self.vault, self.tracker_file, self.logger).load()
+        return self._entry_index
+    
+    def reset_entry_index(self):
+        """Rebuild the index on next use (after the tracker was edited outside this process)"""
+        self._entry_index = None
+    
+    def filter_new_items(self, checked_items, source_date):
+        """Drop items that were already added to the tracker or logger for this date"""
+        entry_index = self.entry_index()
+        new_items = []
+        
+        for item in checked_items:
+            if not entry_index.contains(item, source_date):
+                entry_index.add(item, source_date)
+                new_items.append(item)
+        
+        entry_index.save()
+        return new_items
+    
+    def load_line_state(self, source_date):
+        """Fingerprints of the checked lines the last run saw in this daily note, or None"""
+        if not self.vault.file_exists(self.line_state_file):
+            return None
+        
+        try:
+            state = json.loads(self.vault.read_text(self.line_state_file))
+        except Exception:
+            return None
+        
+        if state.get('note') != source_date:
+            return None
+        return set(state['checked'])
+    
+    def save_line_state(self, source_date, fingerprints):
+        """Stage the fingerprints of this run's checked lines, saved only if the tracker write succeeds"""
+        state = {'note': source_date, 'checked': sorted(fingerprints)}
+        self.vault.write_state(self.line_state_file, json.dumps(state))
+    
     def create_or_update_tracker(self, checked_items, source_date):
         """Create or update the tracker file"""
         if not checked_items:
@@ -82,18 +110,16 @@ class TaskTracker:
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
         
         # Create header if file doesn't exist
-        if not self.tracker_file.exists():
-            with open(self.tracker_file, 'w', encoding='utf-8') as f:
-                f.write("# Task Tracker\n\n")
+        if not self.vault.file_exists(self.tracker_file):
+            self.vault.write_text(self.tracker_file, "# Task Tracker\n\n")
         
         # Append new completed tasks with section header
-        with open(self.tracker_file, 'a', encoding='utf-8') as f:
-            for item in checked_items:
-                f.write(f"- [ ] {item} - {source_date}\n")
-            f.write("\n")
+        new_lines = [f"- [ ] {item} - {source_date}\n" for item in checked_items]
+        self.vault.append_text(self.tracker_file, ''.join(new_lines) + "\n")
+        metrics.count('items_appended', len(new_lines))
     
-    def process_latest_file(self):
-        """Main processing function"""
+    def process_latest_file(self, full=False):
+        """Main processing function (full: ignore the line state of the last run)"""
         # Find latest date file
         latest_file = self.find_latest_date_file()
         if not latest_file:
@@ -106,32 +132,54 @@ class TaskTracker:
         source_file_path = self.obsidian_path / latest_file
         print(f"📄 Processing: {latest_file}")
         
-        # Read source file
-        try:
-            with open(source_file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-        except Exception as e:
-            print(f"❌ Error reading {latest_file}: {e}")
-            return False
-        
-        # Parse and extract checked items (WITHOUT modifying the original file)
-        checked_items = self.parse_markdown_hierarchy(lines)
-        
-        if not checked_items:
-            print("ℹ️  No checked items found")
+        with metrics.file_span(source_file_path):
+            # Parse and extract checked items (WITHOUT modifying the original file)
+            try:
+                checked_items = self.vault.cached_parse(source_file_path, 'checked_items',
+                                                        self.extract_checked_items)
+            except Exception as e:
+                print(f"❌ Error reading {latest_file}: {e}")
+                return False
+            metrics.count('items_extracted', len(checked_items))
+        
+        # Diff against the last run on this note: a checked line's fingerprint is its hierarchy path
+        fingerprints = {entry_key(item, source_date) for item in checked_items}
+        previous = None if full else self.load_line_state(source_date)
+        if fingerprints != previous:
+            self.save_line_state(source_date, fingerprints)
+        
+        if previous is not None:
+            changed_items = [item for item in checked_items if entry_key(item, source_date) not in previous]
+            dropped_count = len(previous - fingerprints)
+            print(f"🔍 Since the last run: {len(changed_items)} newly checked, {dropped_count} unchecked or removed")
+        else:
+            changed_items = checked_items
+        
+        if not changed_items:
+            print("ℹ️  No checked items found" if not checked_items else "ℹ️  No new checked items")
             return True
         
-        print(f"✅ Found {len(checked_items)} checked items:")
-        for item in checked_items:
+        print(f"✅ Found {len(changed_items)} checked items:")
+        for item in changed_items:
             print(f"   • {item}")
         
+        # Skip items an earlier run already emitted, so reruns don't duplicate tracker lines
+        new_items = self.filter_new_items(changed_items, source_date)
+        skipped_count = len(changed_items) - len(new_items)
+        metrics.count('items_deduplicated', skipped_count)
+        if skipped_count:
+            print(f"⏭️  Skipped {skipped_count} items already in 00 Tracker.md or 01 Logger.md")
+        if not new_items:
+            print("ℹ️  No new checked items")
+            return True
+        
         # *** REMOVED THE FILE MODIFICATION CODE ***
         # The original daily file is now preserved with all checkmarks intact
         print(f"📚 Preserved {latest_file} (kept all checkmarks for historical record)")
         
         # Update tracker file
         try:
-            self.create_or_update_tracker(checked_items, source_date)
+            self.create_or_update_tracker(new_items, source_date)
             print(f"📝 Added items to 00 Tracker.md")
         except Exception as e:
             print(f"❌ Error updating tracker: {e}")
@@ -141,6 +189,15 @@ class TaskTracker:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Copy checked items from the latest daily note to 00 Tracker.md")
+    parser.add_argument('--full', action='store_true',
+                        help="check every checked item, not just the ones checked since the last run")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="save a JSON report of timings and I/O counters (or set TASK_MANAGER_METRICS)")
+    parser.add_argument('--profile', metavar='DIR',
+                        help="save cProfile output to DIR (or set TASK_MANAGER_PROFILE)")
+    args = parser.parse_args()
+    
     # Configuration - Load from environment file
     obsidian_path = get_obsidian_path()
     
@@ -149,9 +206,18 @@ def main():
         print(f"❌ Obsidian directory not found: {obsidian_path}")
         sys.exit(1)
     
+    configure_metrics(args.metrics, args.profile)
+    
     # Run task tracker
-    tracker = TaskTracker(obsidian_path)
-    success = tracker.process_latest_file()
+    try:
+        with lock_resources(obsidian_path, STAGE_READS + STAGE_WRITES):
+            tracker = TaskTracker(obsidian_path)
+            with metrics.stage('deeplogging'):
+                success = tracker.process_latest_file(full=args.full) and tracker.vault.flush()
+    except LockTimeout as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    metrics.write_report()
     
     if success:
         print("✨ Task tracking completed successfully!")
@@ -0,0 +1,149 @@
+"""
+Logged Entry Index
+Hash set of (hierarchy text, source date) keys for items that deeplogging
+already emitted, i.e. entries in 00 Tracker.md or 01 Logger.md.
+
+The tracker is small and rewritten often, so its keys are read from the
+(shared) parsed tracker on every run. Logger files only ever grow, so
+their keys are persisted together with the byte offset they cover, and
+each run only reads the lines appended since then. With a monthly logger
+only the files for the dates being checked are loaded at all.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from vault import get_state_path
+
+
+INDEX_FILE = 'logged_entries.json'
+# Per-month logger files keep their keys in this state subfolder
+PARTITION_INDEX_DIR = 'logged_entries'
+
+# Tracker entry text after the checkbox: "task text - YYYY-MM-DD"
+TRACKER_ENTRY_PATTERN = re.compile(r'^(.+) - (\d{4}-\d{2}-\d{2})$')
+# Checked top-level tracker line task_logger moves to the logger: "- [x] task text - YYYY-MM-DD"
+CHECKED_TRACKER_LINE_PATTERN = re.compile(r'^- \[x\] (.+) - (\d{4}-\d{2}-\d{2})$')
+# Logger line: "YYYY-MM-DD - task text"
+LOGGER_ENTRY_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2}) - (.+)$')
+
+# Bytes before the recorded offset that must be unchanged for the persisted keys to be reused
+CHECK_BYTES = 256
+
+
+def entry_key(item, date):
+    """Short hash of an item and its source date"""
+    return hashlib.sha1(f"{date}\t{item}".encode('utf-8')).hexdigest()[:16]
+
+
+class LoggerFileKeys:
+    """Keys of the entries in one logger file, persisted with the byte offset they cover"""
+
+    def __init__(self, vault, logger_file, index_file):
+        self.vault = vault
+        self.logger_file = Path(logger_file)
+        self.index_file = index_file
+        self.logger_keys = []
+        self.logger_offset = 0
+        self.logger_check = ''
+        self._saved_offset = None
+
+    def _read_tail_check(self, f, offset):
+        f.seek(max(0, offset - CHECK_BYTES))
+        return hashlib.sha1(f.read(min(offset, CHECK_BYTES))).hexdigest()
+
+    def load(self):
+        """Load the persisted keys and read the lines appended since the recorded offset"""
+        if self.vault.file_exists(self.index_file):
+            try:
+                saved = json.loads(self.vault.read_text(self.index_file))
+                self.logger_keys = saved['logger_keys']
+                self.logger_offset = saved['logger_offset']
+                self.logger_check = saved['logger_check']
+            except Exception:
+                self.logger_keys, self.logger_offset, self.logger_check = [], 0, ''
+            self._saved_offset = self.logger_offset
+
+        if not self.logger_file.exists():
+            self.logger_keys, self.logger_offset, self.logger_check = [], 0, ''
+            return
+
+        with open(self.logger_file, 'rb') as f:
+            size = f.seek(0, 2)
+
+            # Rebuild if the logger was truncated or edited before the recorded offset
+            if (self.logger_offset > size
+                    or self._read_tail_check(f, self.logger_offset) != self.logger_check):
+                self.logger_keys, self.logger_offset = [], 0
+
+            f.seek(self.logger_offset)
+            new_data = f.read()
+
+        # Only consume complete lines; a partial last line is read again next time
+        complete = new_data[:new_data.rfind(b'\n') + 1]
+        for line in complete.decode('utf-8', 'replace').splitlines():
+            match = LOGGER_ENTRY_PATTERN.match(line.rstrip())
+            if match:
+                self.logger_keys.append(entry_key(match.group(2), match.group(1)))
+
+        self.logger_offset += len(complete)
+        with open(self.logger_file, 'rb') as f:
+            self.logger_check = self._read_tail_check(f, self.logger_offset)
+        return self
+
+    def save(self):
+        """Stage the persisted logger keys to be written with the run's output"""
+        if self.logger_offset == self._saved_offset:
+            return
+        self._saved_offset = self.logger_offset
+        self.vault.write_text(self.index_file, json.dumps({
+            'logger_offset': self.logger_offset,
+            'logger_check': self.logger_check,
+            'logger_keys': self.logger_keys,
+        }))
+
+
+class LoggedEntryIndex:
+    def __init__(self, vault, tracker_file, logger_layout):
+        self.vault = vault
+        self.tracker_file = Path(tracker_file)
+        self.logger_layout = logger_layout
+        self.keys = set()
+        self._logger_files = {}  # {logger file: LoggerFileKeys} loaded so far
+
+    def load(self):
+        """Build the key set from the tracker; logger keys are added per file as dates need them"""
+        if self.vault.file_exists(self.tracker_file):
+            tree = self.vault.read_tasks(self.tracker_file)
+            for node in tree.nodes:
+                if node.indent == 0:
+                    match = TRACKER_ENTRY_PATTERN.match(node.text)
+                    if match:
+                        self.keys.add(entry_key(match.group(1), match.group(2)))
+        return self
+
+    def _load_logger_for(self, date):
+        logger_file = self.logger_layout.file_for(date)
+        if logger_file in self._logger_files:
+            return
+
+        if self.logger_layout.partitioned:
+            index_file = get_state_path(self.vault.obsidian_path, f"{PARTITION_INDEX_DIR}/{logger_file.stem}.json")
+        else:
+            index_file = get_state_path(self.vault.obsidian_path, INDEX_FILE)
+        file_keys = LoggerFileKeys(self.vault, logger_file, index_file).load()
+        self._logger_files[logger_file] = file_keys
+        self.keys.update(file_keys.logger_keys)
+
+    def contains(self, item, date):
+        self._load_logger_for(date)
+        return entry_key(item, date) in self.keys
+
+    def add(self, item, date):
+        self.keys.add(entry_key(item, date))
+
+    def save(self):
+        """Stage the persisted keys of every logger file that was read"""
+        for file_keys in self._logger_files.values():
+            file_keys.save()
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Differential Equivalence Check
+Runs the current parsers (parse_markdown_hierarchy,
+parse_completed_activities, remove_completed_tasks, parse_tracker_file)
+and the faster paths the scripts actually take, or a replacement passed
+with --candidate, on thousands of generated and fuzzed notes and
+trackers, and reports the first input where their outputs differ.
+
+With --against legacy the reference is the parsers the scripts shipped
+with before taskparse.py (see legacy_parsers.py) and the current
+parsers are checked against them. Differences the shared parser made
+on purpose are counted as known divergences; any other difference is a
+failure.
+
+Fuzzed inputs mix tabs and spaces, nest deeply, use unicode, CRLF and
+lone CR line endings, trailing whitespace and near-miss task markers.
+Any change to the parsers should leave this check clean:
+
+    python equivalence.py --notes 5000 --seed 3
+    python equivalence.py --candidate remove_completed_tasks=fastparse:remove_completed_tasks
+    python equivalence.py --against legacy
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter, namedtuple
+from pathlib import Path
+from vaultgen import WORDS, daily_note_lines, random_text
+from taskparse import WIKILINK_PATTERN, parse_tasks
+from note_index import link_target
+import legacy_parsers
+
+
+NOTE_TARGETS = ['parse_markdown_hierarchy', 'parse_completed_activities', 'remove_completed_tasks']
+TRACKER_TARGET = 'parse_tracker_file'
+TARGETS = NOTE_TARGETS + [TRACKER_TARGET]
+
+# Cached results are only stored for files that haven't changed in the last
+# couple of seconds, so inputs are back-dated to exercise the parse cache
+INPUT_AGE_SECONDS = 3600
+
+UNICODE_WORDS = [
+    'café', 'naïve', 'e\u0301tude', 'Straße', '日本語', 'Ελληνικά', 'שלום', 'مرحبا', '🚀',
+    '👩\u200d💻', '\ufb01le', 'zero\u200bwidth', '\u00a0padded', 'line\u2028sep', 'form\x0cfeed',
+]
+INDENT_UNITS = ['\t', '    ', '  ', ' \t', '\t  ', '   ']
+TASK_MARKERS = ['- [x] ', '- [ ] ', '- [x]', '- [ ]', '- [x]  ', '- [ ]\t', '- [X] ', '-[x] ', '* [x] ', '- [x ] ']
+TRAILING = ['', '', '', ' ', '\t', '  \t', '\u00a0']
+LINK_FORMS = ['[[Opp {n}]]', '[[opp_{n}]]', '[[Opp {n}|alias]]', '[[Folder/Opp {n}#Heading]]', '[[Ünï {n}]]']
+
+Case = namedtuple('Case', 'path source')
+
+
+def fuzz_text(rng):
+    """Task text with unicode, wikilinks and " - " separators, sometimes empty"""
+    if rng.random() < 0.05:
+        return ''
+    words = [rng.choice(WORDS + UNICODE_WORDS) for _ in range(rng.randint(1, 5))]
+    if rng.random() < 0.4:
+        words.insert(rng.randint(0, len(words)), rng.choice(LINK_FORMS).format(n=rng.randint(0, 9)))
+    if rng.random() < 0.2:
+        words.insert(rng.randint(0, len(words)), rng.choice(['-', '`- [x]`', '- [x] inline']))
+    return ' '.join(words)
+
+
+def fuzz_note_lines(rng):
+    """Lines of a hostile daily note: mixed indentation, deep nesting and odd markup"""
+    lines = []
+    depth = 0
+    for _ in range(rng.randint(0, 60)):
+        roll = rng.random()
+        if roll < 0.06:
+            lines.append(rng.choice(['# Tasks', '## Notes ' + fuzz_text(rng), '## Completed Activities - 2025-01-02']))
+        elif roll < 0.12:
+            lines.append(rng.choice(['', ' ', '\t', '  \t  ']))
+        elif roll < 0.18:
+            indent = rng.choice(['', '', '\t', '    '])
+            lines.append(indent + rng.choice(['', '- ', '* ', '> ', '> - [x] ', '1. [x] ']) + fuzz_text(rng))
+        else:
+            # Mostly one level deeper or shallower, sometimes a jump of several levels
+            depth = rng.randint(0, min(depth + rng.choice([1, 1, 1, 2, 4]), 12))
+            indent = ''.join(rng.choice(INDENT_UNITS) for _ in range(depth))
+            lines.append(indent + rng.choice(TASK_MARKERS) + fuzz_text(rng) + rng.choice(TRAILING))
+    return end_lines(rng, lines)
+
+
+def fuzz_tracker_lines(rng):
+    """Lines of a hostile tracker: entries with odd spacing, dates and markers between headings"""
+    lines = []
+    for _ in range(rng.randint(0, 80)):
+        roll = rng.random()
+        if roll < 0.05:
+            lines.append(rng.choice(['# Task Tracker', '## Completed Tasks - 2025-07-07 14:30']))
+        elif roll < 0.1:
+            lines.append(rng.choice(['', ' ', '\t']))
+        else:
+            date = rng.choice(['2025-01-02', '2024-12-31', '2025-13-40', '25-01-02', '2025-01-02 10:00'])
+            indent = rng.choice(['', '', '', '', '\t', '  '])
+            text = fuzz_text(rng)
+            if rng.random() < 0.1:
+                text += ' - 2024-06-01'
+            lines.append(f"{indent}{rng.choice(TASK_MARKERS)}{text} - {date}{rng.choice(TRAILING)}")
+    return end_lines(rng, lines)
+
+
+def end_lines(rng, lines):
+    """Add LF, CRLF or lone CR endings (one style or mixed), sometimes leaving the last line open"""
+    style = rng.choice(['\n', '\n', '\r\n', 'mixed'])
+    ended = []
+    for line in lines:
+        ending = rng.choice(['\n', '\r\n', '\r']) if style == 'mixed' else style
+        ended.append(line + ending)
+    if ended and rng.random() < 0.3:
+        ended[-1] = ended[-1].rstrip('\r\n')
+    return ended
+
+
+def generated_note_lines(rng):
+    """A realistic daily note from vaultgen with random settings"""
+    opportunities = [f"Opportunity {number}" for number in range(25)]
+    lines = daily_note_lines(rng, opportunities, rng.randint(1, 60), rng.randint(0, 8),
+                             rng.choice(['\t', '    ', '  ']), rng.random())
+    if rng.random() < 0.2:
+        lines = [line.replace('\n', '\r\n') for line in lines]
+    return lines
+
+
+def generated_tracker_lines(rng):
+    """A realistic tracker like the ones deeplogging writes"""
+    lines = ["# Task Tracker\n", "\n", "## Completed Tasks - 2025-01-02 09:00\n"]
+    for _ in range(rng.randint(0, 200)):
+        mark = 'x' if rng.random() < 0.5 else ' '
+        lines.append(f"- [{mark}] [[Opportunity {rng.randint(0, 24)}]] - {random_text(rng)} - 2025-01-{rng.randint(1, 28):02d}\n")
+    return lines
+
+
+def write_inputs(folder, count, generate, fuzz, rng):
+    """Write count inputs, alternating generated and fuzzed, byte for byte (line endings kept)"""
+    folder.mkdir(parents=True, exist_ok=True)
+    old = time.time_ns() - INPUT_AGE_SECONDS * 10**9
+    cases = []
+    for index in range(count):
+        fuzzed = index % 2 == 1
+        lines = fuzz(rng) if fuzzed else generate(rng)
+        path = folder / f"{index:05d}.md"
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(''.join(lines))
+        os.utime(path, ns=(old, old))
+        cases.append(Case(path, f"{'fuzzed' if fuzzed else 'generated'} input #{index}"))
+    return cases
+
+
+def read_lines(path):
+    """Read a file the way the scripts always have: text mode, file.readlines()"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.readlines()
+
+
+def parse_tracker(vault, path, preload):
+    """Run TaskLogger.parse_tracker_file on path, streamed from disk or from the snapshot's memory"""
+    from task_logger import TaskLogger
+
+    logger = TaskLogger(vault.obsidian_path, vault)
+    logger.tracker_file = path
+    if preload:
+        vault.read_text(path)
+    checked_items, logged_lines = logger.parse_tracker_file()
+    return checked_items, sorted(logged_lines)
+
+
+def reference_functions(vault_path):
+    """The current functions, given each input's lines as the scripts read them"""
+    from vault import VaultSnapshot
+    from deeplogging import TaskTracker
+    import oplog
+    import actrak
+
+    tracker = TaskTracker(vault_path, VaultSnapshot(vault_path))
+    return {
+        'parse_markdown_hierarchy': lambda path: tracker.parse_markdown_hierarchy(read_lines(path)),
+        'parse_completed_activities': lambda path: oplog.parse_completed_activities(read_lines(path)),
+        'remove_completed_tasks': lambda path: actrak.remove_completed_tasks(read_lines(path)),
+        'parse_tracker_file': lambda path: parse_tracker(VaultSnapshot(vault_path), path, preload=False),
+    }
+
+
+def legacy_tracker(lines):
+    """The legacy tracker parse, with the removed lines as line numbers like the current one returns"""
+    checked_items, updated_lines = legacy_parsers.parse_tracker_file(lines)
+    removed = []
+    kept = 0
+    for line_no, line in enumerate(lines):
+        if kept < len(updated_lines) and updated_lines[kept] is line:
+            kept += 1
+        else:
+            removed.append(line_no)
+    return checked_items, removed
+
+
+def legacy_activities(lines):
+    """The legacy oplog parse without the line endings it kept in each part of an activity
+
+    oplog wrote the last one out as a blank line after the activity; they are
+    dropped here so the comparison is about how the note was parsed.
+    """
+    return {opportunity: [activity.replace('\n', '') for activity in activities]
+            for opportunity, activities in legacy_parsers.parse_completed_activities(lines).items()}
+
+
+def legacy_functions():
+    """The parsers as the scripts shipped them before taskparse.py"""
+    return {
+        'parse_markdown_hierarchy': lambda path: legacy_parsers.parse_markdown_hierarchy(read_lines(path)),
+        'parse_completed_activities': lambda path: legacy_activities(read_lines(path)),
+        'remove_completed_tasks': lambda path: legacy_parsers.remove_completed_tasks(read_lines(path)),
+        'parse_tracker_file': lambda path: legacy_tracker(read_lines(path)),
+    }
+
+
+def rewrite_tasks(lines, rewrite, nodes=None):
+    """Apply rewrite(node, line) to the task lines of a note, selected by nodes(tree)"""
+    tree = parse_tasks(lines)
+    lines = list(lines)
+    for node in (nodes or (lambda tree: tree.nodes))(tree):
+        lines[node.line_no] = rewrite(node, lines[node.line_no])
+    return lines
+
+
+def trim_task_text(lines):
+    """Write every task as its indent, "- [ ] " or "- [x] " and its text without surrounding whitespace"""
+    def trimmed(node, line):
+        ending = line[len(line.rstrip('\r\n')):]
+        indent = line[:len(line) - len(line.lstrip(' \t'))]
+        return f"{indent}- [{'x' if node.checked else ' '}] {node.text}{ending}"
+    return rewrite_tasks(lines, trimmed)
+
+
+def blank_empty_tasks(lines):
+    """Replace tasks without text by blank lines"""
+    def empty(tree):
+        return [node for node in tree.nodes if not node.text]
+    return rewrite_tasks(lines, lambda node, line: '\n', empty)
+
+
+def nest_by_tabs(lines):
+    """Indent every task with one tab per level of its place in the tree"""
+    return rewrite_tasks(lines, lambda node, line: '\t' * node.depth + line.lstrip(' \t'))
+
+
+def uncheck_parents(lines):
+    """Uncheck checked tasks that have subtasks"""
+    def parents(tree):
+        return [node for node in tree.nodes if node.checked and any(child.parent is node for child in tree.nodes)]
+    return rewrite_tasks(lines, lambda node, line: line.replace('[x]', '[ ]', 1), parents)
+
+
+def separate_unlinked_roots(lines):
+    """Put a column-0 separator line above every top-level task without a [[link]]"""
+    tree = parse_tasks(lines)
+    unlinked = {node.line_no for node in tree.roots() if node.indent == 0 and not node.links}
+    separated = []
+    for line_no, line in enumerate(lines):
+        if line_no in unlinked:
+            separated.append('---\n')
+        separated.append(line)
+    return separated
+
+
+def plain_root_links(lines):
+    """Drop the |alias and #heading from the links of top-level tasks"""
+    def roots(tree):
+        return tree.roots()
+    return rewrite_tasks(lines, lambda node, line: WIKILINK_PATTERN.sub(
+        lambda match: f"[[{link_target(match.group(1))}]]", line), roots)
+
+
+# Where the current parsers differ from the legacy ones on purpose, each
+# with a rewrite of an input that removes the difference for both and the
+# targets it applies to: task text in notes is trimmed (the legacy parsers
+# kept extra spaces after "- [x]" and oplog kept the line ending; the
+# tracker parse still matches the legacy one exactly), a task
+# without text still holds its place in the hierarchy (deeplogging
+# skipped it), tasks nest under the nearest task with a smaller indent (2-space lists and jumps of
+# several levels included), a checked task's subtasks don't collect its
+# siblings, a top-level task without a [[link]] ends the previous
+# opportunity, and [[Opp|alias]] and [[Opp#Heading]] file under Opp.
+KNOWN_DIVERGENCES = [
+    ('task text whitespace', trim_task_text, NOTE_TARGETS),
+    ('empty tasks', blank_empty_tasks, NOTE_TARGETS),
+    ('relative nesting', nest_by_tabs, NOTE_TARGETS),
+    ('checked-parent siblings', uncheck_parents, NOTE_TARGETS),
+    ('unlinked top-level tasks', separate_unlinked_roots, NOTE_TARGETS),
+    ('aliased opportunity links', plain_root_links, NOTE_TARGETS),
+]
+
+
+def explain_divergence(target, case, candidate, legacy):
+    """Name the known divergences that account for a difference from the legacy parser, or return None
+
+    The rewrites are applied one after another until the outputs agree,
+    then each one the agreement doesn't depend on is dropped again, so
+    only the divergences the input actually shows are named.
+    """
+    original = read_lines(case.path)
+    rewrites = [(name, rewrite) for name, rewrite, targets in KNOWN_DIVERGENCES if target in targets]
+    rewritten_path = case.path.with_name(f"{case.path.stem}.rewritten.md")
+
+    def agrees(names):
+        lines = original
+        for name, rewrite in rewrites:
+            if name in names:
+                lines = rewrite(lines)
+        with open(rewritten_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(''.join(lines))
+        with contextlib.redirect_stdout(io.StringIO()):
+            return first_difference(legacy(rewritten_path), candidate(rewritten_path)) is None
+
+    try:
+        applied = []
+        for name, _ in rewrites:
+            applied.append(name)
+            if agrees(applied):
+                break
+        else:
+            return None
+
+        for name in list(applied):
+            if len(applied) > 1 and agrees([other for other in applied if other != name]):
+                applied.remove(name)
+        return applied
+    finally:
+        if rewritten_path.exists():
+            rewritten_path.unlink()
+
+
+def optimized_functions(vault):
+    """The paths the scripts take: the snapshot's shared task tree and parse cache, and oplog's worker"""
+    from deeplogging import TaskTracker
+    import oplog
+    import actrak
+
+    tracker = TaskTracker(vault.obsidian_path, vault)
+    return {
+        'parse_markdown_hierarchy': lambda path: vault.cached_parse(path, 'checked_items', tracker.extract_checked_items),
+        'parse_completed_activities': lambda path: vault.cached_parse(path, 'opportunity_activities',
+                                                                      oplog.extract_completed_activities),
+        'remove_completed_tasks': lambda path: vault.cached_parse(path, 'open_lines', actrak.open_lines_from_tree)[0],
+        'parse_tracker_file': lambda path: parse_tracker(vault, path, preload=True),
+    }
+
+
+def load_candidate(spec):
+    """Import a TARGET=module:function replacement; it gets an input's lines like the function it replaces"""
+    target, _, location = spec.partition('=')
+    module_name, _, function_name = location.partition(':')
+    if target not in TARGETS or not function_name:
+        raise ValueError(f"expected TARGET=module:function with TARGET one of {', '.join(TARGETS)}: {spec}")
+
+    function = getattr(importlib.import_module(module_name), function_name)
+    if target == TRACKER_TARGET:
+        def candidate(path):
+            checked_items, logged_lines = function(read_lines(path))
+            return checked_items, sorted(logged_lines)
+    else:
+        def candidate(path):
+            return function(read_lines(path))
+    return target, location, candidate
+
+
+def first_difference(expected, actual, where='output'):
+    """Describe where two outputs first differ, or return None if they match (dict order counts)"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        expected, actual = list(expected.items()), list(actual.items())
+    if isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)):
+        for index, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+            difference = first_difference(expected_item, actual_item, f"{where}[{index}]")
+            if difference:
+                return difference
+        if len(expected) != len(actual):
+            return f"{where}: {len(expected)} items expected, {len(actual)} returned"
+        return None
+    if expected != actual:
+        return f"{where}: expected {expected!r}, got {actual!r}"
+    return None
+
+
+def check(target, label, candidate, cases, expected, failures_dir, explain=None):
+    """Compare a candidate against the reference outputs, stopping at the first difference
+
+    explain(target, case, candidate) names the known divergences behind a
+    difference, or returns None if it isn't one.
+    """
+    start = time.perf_counter()
+    known = Counter()  # {divergence: inputs showing it}
+    known_inputs = 0
+    for case in cases:
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                actual = candidate(case.path)
+        except Exception as e:
+            difference = f"raised {type(e).__name__}: {e}"
+        else:
+            difference = first_difference(expected[case.path], actual)
+
+        if difference and explain is not None:
+            divergences = explain(target, case, candidate)
+            if divergences:
+                known_inputs += 1
+                known.update(divergences)
+                continue
+
+        if difference:
+            failures_dir.mkdir(parents=True, exist_ok=True)
+            saved = failures_dir / f"{target}-{case.path.parent.name}-{case.path.name}"
+            shutil.copyfile(case.path, saved)
+            print(f"❌ {target} ({label}) differs on {case.source}")
+            print(f"   {difference}")
+            print(f"   Input saved to {saved}")
+            return False
+
+    elapsed = time.perf_counter() - start
+    if not known_inputs:
+        print(f"✅ {target} ({label}): {len(cases)} inputs identical in {elapsed:.2f}s")
+        return True
+
+    print(f"✅ {target} ({label}): {len(cases) - known_inputs} inputs identical, "
+          f"{known_inputs} differ only in known ways in {elapsed:.2f}s")
+    for divergence, count in known.most_common():
+        print(f"   {divergence}: {count} inputs")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that optimized parser paths give the same output as the current ones")
+    parser.add_argument('--notes', type=int, default=2000, help="daily notes to check (half generated, half fuzzed)")
+    parser.add_argument('--trackers', type=int, default=200, help="trackers to check (half generated, half fuzzed)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--candidate', action='append', default=[], metavar='TARGET=module:function',
+                        help="also check a replacement for one of: " + ', '.join(TARGETS))
+    parser.add_argument('--only-candidates', action='store_true',
+                        help="skip the built-in optimized paths and check only --candidate functions")
+    parser.add_argument('--failures', default='equivalence_failures', metavar='DIR',
+                        help="where to save inputs that produced different output")
+    parser.add_argument('--against', choices=['current', 'legacy'], default='current',
+                        help="reference parsers: the current ones (default), or the ones the scripts "
+                             "shipped with before taskparse.py, with known divergences reported")
+    args = parser.parse_args()
+
+    try:
+        candidates = [load_candidate(spec) for spec in args.candidate]
+    except (ValueError, ImportError, AttributeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    rng = random.Random(args.seed)
+    failures_dir = Path(args.failures)
+    all_equal = True
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        vault_path = Path(work_dir)
+        os.environ['OBSIDIAN_VAULT_PATH'] = str(vault_path)
+        os.environ['PARSE_CACHE_MAX_MB'] = '1024'
+        from vault import VaultSnapshot
+        import oplog
+
+        cases = {target: [] for target in TARGETS}
+        note_cases = write_inputs(vault_path / 'notes', args.notes, generated_note_lines, fuzz_note_lines, rng)
+        for target in NOTE_TARGETS:
+            cases[target] = note_cases
+        cases[TRACKER_TARGET] = write_inputs(vault_path / 'trackers', args.trackers,
+                                             generated_tracker_lines, fuzz_tracker_lines, rng)
+        print(f"🧪 Checking {args.notes} daily notes and {args.trackers} trackers (seed {args.seed})")
+
+        start = time.perf_counter()
+        legacy = args.against == 'legacy'
+        references = legacy_functions() if legacy else reference_functions(vault_path)
+        expected = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for target in TARGETS:
+                expected[target] = {case.path: references[target](case.path) for case in cases[target]}
+        print(f"⏱️  Reference outputs in {time.perf_counter() - start:.2f}s")
+
+        checks = []
+        explain = None
+        if legacy:
+            # Known divergences are only expected of the current parsers and replacements for them
+            def explain(target, case, candidate):
+                return explain_divergence(target, case, candidate, references[target])
+            if not args.only_candidates:
+                checks.extend((target, 'current vs legacy', function)
+                              for target, function in reference_functions(vault_path).items())
+        elif not args.only_candidates:
+            cold = VaultSnapshot(vault_path)
+            checks.extend((target, 'cold cache', function) for target, function in optimized_functions(cold).items())
+            checks.append(('parse_completed_activities', 'oplog worker',
+                           lambda path: oplog.parse_daily_file_worker(path)[0]))
+        checks.extend(candidates)
+
+        for target, label, candidate in checks:
+            if not check(target, label, candidate, cases[target], expected[target], failures_dir, explain):
+                all_equal = False
+
+        if not legacy and not args.only_candidates:
+            # A second snapshot reads the results the first one cached back from disk
+            cold.parse_cache.save()
+            warm = VaultSnapshot(vault_path)
+            for target, function in optimized_functions(warm).items():
+                if target in NOTE_TARGETS and not check(target, 'warm cache', function, cases[target],
+                                                        expected[target], failures_dir):
+                    all_equal = False
+
+    if not all_equal:
+        print("❌ Outputs differ")
+        sys.exit(1)
+    print("✨ All outputs identical" if not legacy else "✨ No differences from the legacy parsers beyond the known ones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+History Index
+SQLite index of every logged item: entries task_logger moves to
+01 Logger.md and activities oplog adds to opportunity files. Each row
+holds the date, opportunity, hierarchy path, task text, source daily note
+and the markdown file it was written to, with indexes on date and
+opportunity and a full-text index on the text.
+
+The writers stage rows while they stage their markdown appends, and the
+rows are committed when the vault is flushed. rebuild() recreates the
+index from the markdown, for history logged before the index existed.
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+from note_index import loose_key, link_target
+from taskparse import WIKILINK_PATTERN
+
+
+HISTORY_DB = 'history.sqlite'
+
+LOGGER_KIND = 'logger'
+ACTIVITY_KIND = 'activity'
+
+# "## Completed Activities - YYYY-MM-DD" section heading in an opportunity file
+ACTIVITY_HEADING_PATTERN = re.compile(r'^## Completed Activities - (\d{4}-\d{2}-\d{2})\s*$')
+ACTIVITY_ITEM_PATTERN = re.compile(r'^- (?:\[[ xX]\]\s*)?(.+?)\s*$')
+LOGGER_LINE_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2}) - (.+?)\s*$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    date TEXT NOT NULL,
+    opportunity TEXT NOT NULL,
+    opportunity_key TEXT NOT NULL,
+    path TEXT NOT NULL,
+    text TEXT NOT NULL,
+    source TEXT NOT NULL,
+    file TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_date ON entries (date);
+CREATE INDEX IF NOT EXISTS entries_opportunity ON entries (opportunity_key, date);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    path, content='entries', content_rowid='id'
+);
+"""
+
+
+def split_entry(entry):
+    """Split "[[Opportunity]] - parent - task" into (opportunity, hierarchy path, task text)"""
+    opportunity = ''
+    path = entry.strip()
+
+    match = WIKILINK_PATTERN.match(path)
+    if match:
+        opportunity = link_target(match.group(1))
+        path = path[match.end():].lstrip()
+        if path.startswith('- '):
+            path = path[2:]
+
+    text = path.rsplit(' - ', 1)[-1]
+    return opportunity, path, text
+
+
+class HistoryIndex:
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.pending = []  # rows staged until the vault is flushed
+        self._conn = None
+        self.has_fts = False
+
+    def connect(self):
+        """Open the database, creating the schema on first use"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path))
+            self._conn.executescript(SCHEMA)
+            try:
+                self._conn.executescript(FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: text filters fall back to LIKE
+                self.has_fts = False
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def add(self, kind, date, opportunity, path, text, source, file):
+        self.pending.append((kind, date, opportunity, loose_key(opportunity), path, text, source, file))
+
+    def add_logger_entry(self, date, entry, file):
+        """Stage a "[[Opportunity]] - parent - task" entry moved to the logger file at file (vault-relative)"""
+        opportunity, path, text = split_entry(entry)
+        self.add(LOGGER_KIND, date, opportunity, path, text, f"{date}.md", file)
+
+    def add_activity(self, date, opportunity, activity, file):
+        """Stage a "parent - task" activity added to an opportunity file"""
+        text = activity.rsplit(' - ', 1)[-1]
+        self.add(ACTIVITY_KIND, date, opportunity, activity, text, f"{date}.md", Path(file).name)
+
+    def discard(self):
+        self.pending = []
+
+    def commit(self):
+        """Write the staged rows in one transaction"""
+        if not self.pending:
+            return True
+
+        try:
+            conn = self.connect()
+            with conn:
+                self._insert(conn, self.pending)
+            self.pending = []
+            return True
+        except Exception as e:
+            print(f"⚠️  Could not update history index: {e}")
+            return False
+
+    def _insert(self, conn, rows):
+        for row in rows:
+            cursor = conn.execute(
+                "INSERT INTO entries (kind, date, opportunity, opportunity_key, path, text, source, file) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+            if self.has_fts:
+                conn.execute("INSERT INTO entries_fts (rowid, path) VALUES (?, ?)", (cursor.lastrowid, row[4]))
+
+    def is_built(self):
+        """Check if the index was ever rebuilt from the markdown history"""
+        if not self.db_path.exists():
+            return False
+        row = self.connect().execute("SELECT value FROM meta WHERE key = 'built'").fetchone()
+        return row is not None
+
+    def rebuild(self, vault, logger_files):
+        """Recreate the index from the logger files and every opportunity file's activity sections"""
+        rows = []
+
+        for logger_file in logger_files:
+            name = Path(logger_file).relative_to(vault.obsidian_path).as_posix()
+            for line in vault.iter_lines(logger_file):
+                match = LOGGER_LINE_PATTERN.match(line)
+                if match:
+                    opportunity, path, text = split_entry(match.group(2))
+                    rows.append((LOGGER_KIND, match.group(1), opportunity, loose_key(opportunity),
+                                 path, text, f"{match.group(1)}.md", name))
+
+        for note in vault.note_index.by_relative.values():
+            text = vault.read_text(note)
+            if '## Completed Activities' not in text:
+                continue
+
+            date = None
+            for line in text.splitlines():
+                heading = ACTIVITY_HEADING_PATTERN.match(line)
+                if heading:
+                    date = heading.group(1)
+                    continue
+                if line.startswith('#'):
+                    date = None
+                    continue
+
+                item = ACTIVITY_ITEM_PATTERN.match(line)
+                if item and date:
+                    activity = item.group(1)
+                    rows.append((ACTIVITY_KIND, date, note.stem, loose_key(note.stem),
+                                 activity, activity.rsplit(' - ', 1)[-1], f"{date}.md", note.name))
+
+        conn = self.connect()
+        with conn:
+            conn.execute("DELETE FROM entries")
+            if self.has_fts:
+                conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('delete-all')")
+            self._insert(conn, rows)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('built', '1')")
+        return len(rows)
+
+    def query(self, since=None, until=None, opportunity=None, text=None, kind=None, limit=None):
+        """Return matching entries as dicts, newest first"""
+        conditions = []
+        params = []
+
+        if since:
+            conditions.append("e.date >= ?")
+            params.append(since)
+        if until:
+            conditions.append("e.date <= ?")
+            params.append(until)
+        if opportunity:
+            conditions.append("e.opportunity_key = ?")
+            params.append(loose_key(link_target(opportunity.strip('[]'))))
+        if kind:
+            conditions.append("e.kind = ?")
+            params.append(kind)
+
+        conn = self.connect()
+        source = "entries e"
+        if text and self.has_fts:
+            # Every word must match, as a prefix
+            source = "entries e JOIN entries_fts ON entries_fts.rowid = e.id"
+            conditions.append("entries_fts MATCH ?")
+            params.append(' '.join('"' + word.replace('"', '""') + '"*' for word in text.split()))
+        elif text:
+            for word in text.split():
+                conditions.append("e.path LIKE ?")
+                params.append(f"%{word}%")
+
+        sql = f"SELECT e.kind, e.date, e.opportunity, e.path, e.text, e.source, e.file FROM {source}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY e.date DESC, e.id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        columns = ('kind', 'date', 'opportunity', 'path', 'text', 'source', 'file')
+        return [dict(zip(columns, row)) for row in conn.execute(sql, params)]
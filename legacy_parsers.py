@@ -0,0 +1,167 @@
+"""
+Legacy Parsers
+Frozen copies of the task parsers the scripts shipped with before they
+moved to the shared parser in taskparse.py: deeplogging's
+parse_markdown_hierarchy, oplog's parse_completed_activities, actrak's
+remove_completed_tasks and task_logger's parse_tracker_file, each taking
+a list of lines. equivalence.py --against legacy compares the current
+parsers with them.
+
+They are the reference for that check, so leave them as they are, bugs
+included.
+"""
+
+import re
+
+
+def parse_markdown_hierarchy(lines):
+    """Parse markdown lines and extract hierarchy with checked items"""
+    checked_items = []
+    parent_stack = []
+
+    for line in lines:
+        line_content = line.rstrip()
+
+        if not line_content:
+            continue
+
+        # Calculate indentation level
+        indent_level = 0
+        if line_content.startswith('\t'):
+            indent_level = len(line_content) - len(line_content.lstrip('\t'))
+        elif line_content.startswith('    '):
+            indent_level = (len(line_content) - len(line_content.lstrip(' '))) // 4
+
+        content = line_content.strip()
+
+        # Check for checkbox item
+        checkbox_match = re.match(r'^- \[([ x])\] (.+)$', content)
+        if checkbox_match:
+            is_checked = checkbox_match.group(1) == 'x'
+            task_text = checkbox_match.group(2)
+
+            # Adjust parent stack to current level
+            parent_stack = parent_stack[:indent_level]
+
+            if is_checked:
+                # Build parent hierarchy
+                parent_hierarchy = ' - '.join(parent_stack) if parent_stack else ''
+                full_text = f"{parent_hierarchy} - {task_text}" if parent_hierarchy else task_text
+                checked_items.append(full_text)
+            else:
+                # Add unchecked item to parent stack
+                parent_stack.append(task_text)
+
+    return checked_items
+
+
+def extract_opportunity_link(text):
+    """Extract opportunity name from [[Opportunity Name]] format."""
+    match = re.search(r'\[\[([^\]]+)\]\]', text)
+    return match.group(1) if match else None
+
+
+def parse_completed_activities(lines):
+    """Parse completed activities under opportunity parent records."""
+    opportunity_activities = {}  # {opportunity_name: [activities]}
+    hierarchy_stack = {}  # {depth: task_text}
+    current_opportunity = None
+
+    for line in lines:
+        stripped_line = line.lstrip()
+        indent_level = len(line) - len(stripped_line)
+
+        # Check if this is a task line
+        if re.match(r'^- \[[x ]\]', stripped_line):
+            is_completed = stripped_line.startswith('- [x]')
+            task_text = re.sub(r'^- \[[x ]\]\s*', '', stripped_line)
+
+            # Calculate depth
+            if line.startswith('\t'):
+                depth = len(line) - len(line.lstrip('\t'))
+            else:
+                leading_spaces = indent_level
+                if leading_spaces >= 4:
+                    depth = leading_spaces // 4
+                elif leading_spaces >= 2:
+                    depth = leading_spaces // 2
+                elif leading_spaces >= 1:
+                    depth = leading_spaces
+                else:
+                    depth = 0
+
+            # Store this task at its depth level
+            hierarchy_stack[depth] = task_text
+
+            # Remove deeper levels
+            keys_to_remove = [k for k in hierarchy_stack.keys() if k > depth]
+            for k in keys_to_remove:
+                del hierarchy_stack[k]
+
+            # Check if this is a top-level opportunity (depth 0)
+            if depth == 0:
+                opportunity_name = extract_opportunity_link(task_text)
+                if opportunity_name:
+                    current_opportunity = opportunity_name
+                    if current_opportunity not in opportunity_activities:
+                        opportunity_activities[current_opportunity] = []
+
+            # If this is a completed task and we're under an opportunity
+            if is_completed and current_opportunity and depth > 0:
+                # Build hierarchy from level 0 to current depth, excluding the opportunity itself
+                hierarchy_parts = []
+                for level in sorted([k for k in hierarchy_stack.keys() if k > 0]):
+                    if hierarchy_stack[level].strip():
+                        hierarchy_parts.append(hierarchy_stack[level])
+
+                if hierarchy_parts:
+                    activity_text = ' - '.join(hierarchy_parts)
+                    opportunity_activities[current_opportunity].append(activity_text)
+
+        # Reset current opportunity if we hit a non-indented non-task line
+        elif not line.startswith(' ') and not line.startswith('\t') and stripped_line:
+            current_opportunity = None
+
+    return opportunity_activities
+
+
+def remove_completed_tasks(lines):
+    """Remove lines that contain completed tasks (- [x])."""
+    filtered_lines = []
+
+    for line in lines:
+        stripped_line = line.lstrip()
+        # Skip lines that are completed tasks
+        if re.match(r'^- \[x\]', stripped_line):
+            continue
+        filtered_lines.append(line)
+
+    return filtered_lines
+
+
+def parse_tracker_file(lines):
+    """Parse tracker lines and extract checked items"""
+    checked_items = []
+    updated_lines = []
+
+    for line in lines:
+        original_line = line
+        line_content = line.rstrip()
+
+        # Check for checked checkbox pattern: - [x] task text - date
+        checkbox_match = re.match(r'^- \[x\] (.+) - (\d{4}-\d{2}-\d{2})$', line_content)
+        if checkbox_match:
+            task_text = checkbox_match.group(1)
+            date = checkbox_match.group(2)
+
+            # Create new format: date - task text
+            logged_item = f"{date} - {task_text}"
+            checked_items.append(logged_item)
+
+            # Skip adding this line to updated_lines (remove it)
+            continue
+
+        # Keep all other lines
+        updated_lines.append(original_line)
+
+    return checked_items, updated_lines
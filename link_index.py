@@ -0,0 +1,183 @@
+"""
+Link Index
+Every [[link]] in the daily notes (archived ones included), with the line
+it is on, its depth in the task hierarchy, whether its task is checked,
+the [[Opportunity]] the task is filed under and its "parent - task" path.
+
+Kept on disk in the vault state folder and refreshed incrementally: a
+note is only re-read when its mtime or size changed (archived notes when
+their content hash did). Backlinks are answered from memory without
+opening any markdown.
+"""
+
+import marshal
+import os
+import sys
+import time
+from pathlib import Path
+from note_index import NOTE_SUFFIX, loose_key, link_target
+from taskparse import WIKILINK_PATTERN, parse_tasks, opportunity_link
+from parse_cache import RACY_MTIME_SECONDS
+
+
+LINK_INDEX_FILE = 'link_index.bin'
+
+# Bump when the stored link tuples change shape so old indexes are rebuilt
+INDEX_VERSION = 2
+
+# depth and checked for links outside tasks (headings, paragraphs)
+NOT_A_TASK = -1
+
+# Fields of a stored link, in order
+LINK_FIELDS = ('key', 'link', 'line', 'depth', 'checked', 'opportunity', 'path')
+
+
+def link_key(link):
+    """The loose name of the note a link points to, ignoring folders, |alias and #heading"""
+    name = link_target(link)
+    if name.endswith(NOTE_SUFFIX):
+        name = name[:-len(NOTE_SUFFIX)]
+    return loose_key(name.rsplit('/', 1)[-1])
+
+
+def extract_links(tree):
+    """Every link in a note's task tree and other lines, in line order
+
+    Link names are interned, so marshal stores each one once per index
+    file rather than once per link.
+    """
+    intern = sys.intern
+    links = []
+    task_lines = set()
+
+    for node in tree.nodes:
+        task_lines.add(node.line_no)
+        if not node.links:
+            continue
+        path = ' - '.join([parent.text for parent in node.ancestors() if parent.text] + [node.text])
+        opportunity = opportunity_link(node) or ''
+        for link in node.links:
+            links.append((intern(link_key(link)), intern(link), node.line_no, node.depth, int(node.checked),
+                          intern(opportunity), path))
+
+    for line_no, line in enumerate(tree.lines):
+        if '[[' in line and line_no not in task_lines:
+            for link in WIKILINK_PATTERN.findall(line):
+                links.append((intern(link_key(link)), intern(link), line_no, NOT_A_TASK, NOT_A_TASK, '', line.strip()))
+
+    links.sort(key=lambda link: link[2])
+    return links
+
+
+class LinkIndex:
+    def __init__(self, index_file):
+        self.index_file = Path(index_file)
+        self.notes = {}  # {"YYYY-MM-DD.md": [validator, [link tuples]]}
+        self.dirty = False
+        self._by_key = None  # {link key: [(note name, link tuple)]}, built on first query
+
+    def load(self):
+        """Load the index; a missing, stale or corrupt file starts an empty index"""
+        if not self.index_file.exists():
+            return self
+
+        try:
+            with open(self.index_file, 'rb') as f:
+                data = marshal.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.notes = data['notes']
+        except Exception:
+            self.notes = {}
+        return self
+
+    def save(self):
+        """Write the index if it changed, replacing the old file in one step"""
+        if not self.dirty:
+            return
+
+        temp_file = self.index_file.with_name(self.index_file.name + '.tmp')
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_file, 'wb') as f:
+                marshal.dump({'version': INDEX_VERSION, 'notes': self.notes}, f)
+            os.replace(temp_file, self.index_file)
+            self.dirty = False
+        except Exception as e:
+            print(f"⚠️  Could not save link index: {e}")
+
+    def _set(self, name, validator, links):
+        self.notes[name] = [validator, links]
+        self.dirty = True
+        self._by_key = None
+
+    def refresh(self, vault, archive=None):
+        """Re-read the daily notes that changed since the last refresh and drop deleted ones
+
+        archive is a DailyArchive whose notes are indexed too. Returns the
+        number of notes re-read.
+        """
+        seen = set()
+        updated = 0
+        staged = set(vault.pending_files())
+
+        for path in vault.daily_files():
+            seen.add(path.name)
+            entry = self.notes.get(path.name)
+            validator = None
+            if path not in staged:
+                stat = os.stat(path)
+                # Files this fresh may change again within the same mtime tick
+                if time.time() - stat.st_mtime_ns / 1e9 > RACY_MTIME_SECONDS:
+                    validator = [stat.st_mtime_ns, stat.st_size]
+            if entry is not None and validator is not None and entry[0] == validator:
+                continue
+            self._set(path.name, validator, extract_links(vault.read_tasks(path)))
+            updated += 1
+
+        if archive is not None:
+            # A note back in the vault root wins over its archived copy
+            changed = {}
+            for day in archive.dates():
+                name = f"{day}{NOTE_SUFFIX}"
+                if name in seen:
+                    continue
+                seen.add(name)
+                validator = ['archive', archive.note_hash(day)]
+                entry = self.notes.get(name)
+                if entry is None or entry[0] != validator:
+                    changed[day] = validator
+            for day, lines in archive.iter_notes(changed):
+                self._set(f"{day}{NOTE_SUFFIX}", changed[day], extract_links(parse_tasks(lines)))
+                updated += 1
+
+        for name in [name for name in self.notes if name not in seen]:
+            del self.notes[name]
+            self.dirty = True
+            self._by_key = None
+
+        return updated
+
+    def backlinks(self, note, since=None, until=None, checked=None):
+        """Return every link to a note as dicts, newest daily note first
+
+        checked=True keeps links on checked tasks, False on open tasks.
+        """
+        if self._by_key is None:
+            self._by_key = {}
+            for name, (_, links) in self.notes.items():
+                for link in links:
+                    self._by_key.setdefault(link[0], []).append((name, link))
+
+        matches = []
+        for name, link in self._by_key.get(link_key(note.strip('[]')), []):
+            date = name[:-len(NOTE_SUFFIX)]
+            if since and date < since or until and date > until:
+                continue
+            if checked is not None and link[4] != int(checked):
+                continue
+            match = dict(zip(LINK_FIELDS, link))
+            match['date'] = date
+            matches.append(match)
+
+        matches.sort(key=lambda match: (match['date'], -match['line']), reverse=True)
+        return matches
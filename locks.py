@@ -0,0 +1,103 @@
+"""
+Vault Locks
+Advisory locks on the groups of files the stages write: the tracker, the
+logger, the daily notes and the opportunity notes. A lock is an flock
+(msvcrt lock on Windows) on a file in the vault state folder, so runs
+that overlap (a nightly pipeline and watch mode, or two pipelines) wait
+for each other instead of rewriting the tracker under each other.
+Locks are released automatically if the process dies.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from config import get_float_setting
+from vault import get_state_path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+TRACKER = 'tracker'
+LOGGER = 'logger'
+DAILY_NOTES = 'daily-notes'
+OPPORTUNITY_NOTES = 'opportunity-notes'
+
+DEFAULT_LOCK_TIMEOUT = 300
+POLL_INTERVAL = 0.1
+
+
+class LockTimeout(TimeoutError):
+    pass
+
+
+class ResourceLock:
+    def __init__(self, obsidian_path, resource):
+        self.resource = resource
+        self.lock_file = get_state_path(obsidian_path, f"locks/{resource}.lock")
+        self._fd = None
+
+    def _try_lock(self):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self, timeout):
+        """Wait up to timeout seconds for the lock"""
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT)
+
+        deadline = time.monotonic() + timeout
+        announced = False
+        while not self._try_lock():
+            if time.monotonic() >= deadline:
+                os.close(self._fd)
+                self._fd = None
+                raise LockTimeout(f"{self.resource} is still locked by another run after {timeout:.0f}s")
+            if not announced:
+                print(f"⏳ Waiting for another run to release {self.resource}...")
+                announced = True
+            time.sleep(POLL_INTERVAL)
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+@contextmanager
+def lock_resources(obsidian_path, resources, timeout=None):
+    """Hold the locks of several resources, taken in a fixed order so runs can't deadlock"""
+    if timeout is None:
+        timeout = get_float_setting('TASK_MANAGER_LOCK_TIMEOUT', DEFAULT_LOCK_TIMEOUT)
+
+    # Nothing to guard yet; the stage reports the missing vault itself
+    if not os.path.isdir(obsidian_path):
+        yield
+        return
+
+    held = []
+    try:
+        for resource in sorted(set(resources)):
+            lock = ResourceLock(obsidian_path, resource)
+            lock.acquire(timeout)
+            held.append(lock)
+        yield
+    finally:
+        for lock in reversed(held):
+            lock.release()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Logger Files
+Where logged entries live: one 01 Logger.md (the default), or one file
+per month in a 01 Logger folder (LOGGER_LAYOUT=monthly), e.g.
+01 Logger/2025-01.md, with a small index of months and entry counts in
+the vault state folder. Entries are filed by their date, so appends and
+a month's history only touch one small file however long the log gets.
+
+Also a tail reader that seeks backwards from the end of the newest files
+to return the last entries without reading the log from the start.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from config import get_obsidian_path, get_setting
+from vault import VaultSnapshot, get_state_path
+
+
+LOGGER_NAME = "01 Logger"
+SINGLE_LAYOUT = 'single'
+MONTHLY_LAYOUT = 'monthly'
+PARTITION_INDEX_FILE = 'logger_partitions.json'
+
+PARTITION_NAME_PATTERN = re.compile(r'^(\d{4}-\d{2})\.md$')
+DATED_LINE_PATTERN = re.compile(r'^(\d{4}-\d{2})-\d{2} - ')
+
+TAIL_BLOCK_SIZE = 8192
+
+
+def tail_lines(path, count, block_size=TAIL_BLOCK_SIZE):
+    """Return the last count non-empty lines of a file, reading blocks backwards from the end"""
+    if count <= 0:
+        return []
+
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b''
+        # Blank lines don't count, and the first line in the buffer may be partial
+        while position > 0 and sum(1 for line in data.split(b'\n')[1:] if line.strip()) < count:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+
+    if position > 0:
+        data = data[data.index(b'\n') + 1:]
+    lines = [line for line in data.decode('utf-8', 'replace').splitlines() if line.strip()]
+    return lines[-count:]
+
+
+class LoggerLayout:
+    def __init__(self, vault, layout=None):
+        self.vault = vault
+        if layout is None:
+            layout = get_setting('LOGGER_LAYOUT', SINGLE_LAYOUT).lower()
+        self.partitioned = layout == MONTHLY_LAYOUT
+        self.single_file = vault.obsidian_path / f"{LOGGER_NAME}.md"
+        self.partition_dir = vault.obsidian_path / LOGGER_NAME
+        self.index_file = get_state_path(vault.obsidian_path, PARTITION_INDEX_FILE)
+        self._months = None  # {YYYY-MM: entry count}
+
+    def file_for(self, date):
+        """The logger file that holds entries for a YYYY-MM-DD date"""
+        if not self.partitioned:
+            return self.single_file
+        return self.partition_dir / f"{date[:7]}.md"
+
+    @property
+    def months(self):
+        """Months with a partition file and their entry counts, from the index"""
+        if self._months is None:
+            try:
+                self._months = json.loads(self.vault.read_text(self.index_file))
+            except Exception:
+                self._months = self._scan_partitions()
+        return self._months
+
+    def _scan_partitions(self):
+        months = {}
+        if self.partition_dir.is_dir():
+            with os.scandir(self.partition_dir) as entries:
+                for entry in entries:
+                    match = PARTITION_NAME_PATTERN.match(entry.name)
+                    if match and entry.is_file():
+                        with open(entry.path, 'r', encoding='utf-8') as f:
+                            months[match.group(1)] = sum(1 for line in f if line.strip())
+        return months
+
+    def files(self):
+        """Every logger file, oldest first"""
+        if not self.partitioned:
+            return [self.single_file] if self.vault.file_exists(self.single_file) else []
+        return [self.partition_dir / f"{month}.md" for month in sorted(self.months)]
+
+    def append(self, entries):
+        """Stage "YYYY-MM-DD - text" logger lines, each in the file for its date"""
+        by_file = {}
+        for entry in entries:
+            by_file.setdefault(self.file_for(entry[:10]), []).append(entry)
+
+        for path, lines in by_file.items():
+            self.vault.append_text(path, ''.join(f"{line}\n" for line in lines))
+            if self.partitioned:
+                month = path.stem
+                self.months[month] = self.months.get(month, 0) + len(lines)
+
+        if self.partitioned and by_file:
+            self.vault.write_text(self.index_file, json.dumps(self.months, indent=2, sort_keys=True))
+
+    def tail(self, count):
+        """Return the last count logger entries, newest last, reading only the ends of the newest files"""
+        lines = []
+        for path in reversed(self.files()):
+            if len(lines) >= count:
+                break
+            if self.vault.has_staged_write(path):
+                file_lines = [line.rstrip('\n') for line in self.vault.read_lines(path) if line.strip()]
+                file_lines = file_lines[-(count - len(lines)):]
+            elif path.exists():
+                file_lines = tail_lines(path, count - len(lines))
+            else:
+                continue
+            lines = file_lines + lines
+        return lines
+
+    def month(self, month):
+        """Return the logger entries for a YYYY-MM month"""
+        if self.partitioned:
+            path = self.partition_dir / f"{month}.md"
+            if not self.vault.file_exists(path):
+                return []
+            return [line.rstrip('\n') for line in self.vault.iter_lines(path) if line.strip()]
+
+        # A single logger has to be scanned
+        if not self.vault.file_exists(self.single_file):
+            return []
+        return [line.rstrip('\n') for line in self.vault.iter_lines(self.single_file)
+                if line.startswith(f"{month}-")]
+
+    def migrate(self):
+        """Split 01 Logger.md into monthly files; the original is kept as 01 Logger.md.bak"""
+        if not self.single_file.exists():
+            print("ℹ️  No 01 Logger.md to split")
+            return False
+
+        # Undated lines stay with the entry above them
+        month = None
+        pending = []
+        moved = 0
+        for line in self.vault.iter_lines(self.single_file):
+            match = DATED_LINE_PATTERN.match(line)
+            if match:
+                month = match.group(1)
+            if month is None:
+                pending.append(line)
+                continue
+            path = self.partition_dir / f"{month}.md"
+            self.vault.append_text(path, ''.join(pending) + line)
+            pending = []
+            if line.strip():
+                self.months[month] = self.months.get(month, 0) + 1
+                moved += 1
+
+        if not self.months:
+            print("ℹ️  01 Logger.md has no dated entries to split")
+            return False
+
+        self.vault.write_text(self.index_file, json.dumps(self.months, indent=2, sort_keys=True))
+        if not self.vault.flush():
+            return False
+        os.replace(self.single_file, self.single_file.with_name(self.single_file.name + '.bak'))
+        print(f"📦 Moved {moved} entries into {len(self.months)} monthly files in {self.partition_dir.name}/")
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read recent logger entries or split the logger by month")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    tail_parser = subparsers.add_parser('tail', help="print the last logged entries")
+    tail_parser.add_argument('-n', '--lines', type=int, default=20)
+    month_parser = subparsers.add_parser('month', help="print one month's entries")
+    month_parser.add_argument('month', metavar='YYYY-MM')
+    subparsers.add_parser('migrate', help="split 01 Logger.md into monthly files (set LOGGER_LAYOUT=monthly after)")
+    args = parser.parse_args()
+
+    # Configuration - Load from environment file
+    obsidian_path = get_obsidian_path()
+
+    # Verify obsidian directory exists
+    if not os.path.exists(obsidian_path):
+        print(f"❌ Obsidian directory not found: {obsidian_path}")
+        sys.exit(1)
+
+    vault = VaultSnapshot(obsidian_path)
+    if args.command == 'migrate':
+        if LoggerLayout(vault, MONTHLY_LAYOUT).partition_dir.exists():
+            print(f"❌ {LOGGER_NAME}/ already exists")
+            sys.exit(1)
+        if not LoggerLayout(vault, MONTHLY_LAYOUT).migrate():
+            sys.exit(1)
+        return
+
+    layout = LoggerLayout(vault)
+    lines = layout.tail(args.lines) if args.command == 'tail' else layout.month(args.month)
+    for line in lines:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
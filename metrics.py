@@ -0,0 +1,140 @@
+"""
+Run Metrics
+Optional instrumentation for the task manager scripts: timed spans per
+stage and per file, counters for lines parsed, bytes and files read and
+written, and items extracted, deduplicated and appended, saved as a JSON
+report. Stages can also be profiled with cProfile.
+
+Disabled unless turned on with --metrics/--profile or the
+TASK_MANAGER_METRICS / TASK_MANAGER_PROFILE settings; when disabled
+every call returns straight away.
+"""
+
+import cProfile
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from config import get_setting
+
+
+class RunMetrics:
+    def __init__(self):
+        self.enabled = False
+        self.report_path = None
+        self.profile_dir = None
+        self.started_at = None
+        self._start = None
+        self._local = threading.local()  # current stage, per thread (stages can run in parallel)
+        self._lock = threading.Lock()
+        self.spans = []
+        self.counters = Counter()
+        self.stage_counters = {}  # {stage: Counter}
+
+    def enable(self, report_path=None, profile_dir=None):
+        """Start recording; profile_dir also saves a .prof file per stage"""
+        self.enabled = True
+        self.report_path = Path(report_path) if report_path else None
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        if self.profile_dir:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            if self.report_path is None:
+                self.report_path = self.profile_dir / 'metrics.json'
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+
+    @property
+    def _stage(self):
+        return getattr(self._local, 'stage', None)
+
+    @_stage.setter
+    def _stage(self, name):
+        self._local.stage = name
+
+    def count(self, name, amount=1):
+        """Add to a counter, for the run and for the current stage"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] += amount
+            if self._stage is not None:
+                self.stage_counters.setdefault(self._stage, Counter())[name] += amount
+
+    @contextmanager
+    def stage(self, name):
+        """Time a whole stage (and profile it if profiling is on)"""
+        if not self.enabled:
+            yield
+            return
+
+        previous_stage = self._stage
+        self._stage = name
+        profiler = None
+        if self.profile_dir and previous_stage is None:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(str(self.profile_dir / f"{name}.prof"))
+            self.spans.append({'kind': 'stage', 'name': name, 'seconds': round(elapsed, 6)})
+            self._stage = previous_stage
+
+    @contextmanager
+    def file_span(self, path):
+        """Time the work on one file within the current stage"""
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append({'kind': 'file', 'stage': self._stage, 'name': Path(path).name,
+                               'seconds': round(time.perf_counter() - start, 6)})
+
+    def report(self):
+        """Build the machine-readable report"""
+        return {
+            'started_at': self.started_at,
+            'total_seconds': round(time.perf_counter() - self._start, 6) if self._start else 0.0,
+            'stages': {span['name']: span['seconds'] for span in self.spans if span['kind'] == 'stage'},
+            'counters': dict(self.counters),
+            'stage_counters': {stage: dict(counters) for stage, counters in self.stage_counters.items()},
+            'spans': self.spans,
+        }
+
+    def write_report(self, path=None):
+        """Save the report as JSON if metrics are enabled"""
+        path = Path(path) if path else self.report_path
+        if not self.enabled or path is None:
+            return
+
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.report(), f, indent=2)
+            print(f"📈 Saved metrics report to {path}")
+        except Exception as e:
+            print(f"⚠️  Could not save metrics report: {e}")
+
+
+# Shared by every module in the process
+metrics = RunMetrics()
+
+
+def configure(report_path=None, profile_dir=None):
+    """Enable metrics from explicit options, falling back to the environment settings"""
+    report_path = report_path or get_setting('TASK_MANAGER_METRICS')
+    profile_dir = profile_dir or get_setting('TASK_MANAGER_PROFILE')
+    if report_path or profile_dir:
+        metrics.enable(report_path, profile_dir)
+    return metrics
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Multi-Vault Runner
+Runs the full pipeline for several vaults at once, each in its own
+process so one vault's failure can't affect the others. Vaults come from
+the command line or a registry file (one vault path per line, # for
+comments), and the run ends with a summary and timings per vault.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from config import get_setting
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PIPELINE_SCRIPT = SCRIPT_DIR / 'pipeline.py'
+DEFAULT_JOBS = 4
+
+
+def read_registry(registry_file):
+    """Read vault paths from a registry file, skipping blank lines and comments"""
+    vaults = []
+    with open(registry_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                vaults.append(line)
+    return vaults
+
+
+def run_vault(vault_path, pipeline_args, log_dir=None):
+    """Run pipeline.py for one vault and return its result"""
+    result = {'vault': vault_path, 'success': False, 'seconds': 0.0, 'error': None, 'output': ''}
+
+    if not os.path.isdir(vault_path):
+        result['error'] = "vault directory not found"
+        return result
+
+    env = dict(os.environ, OBSIDIAN_VAULT_PATH=vault_path)
+    start = time.perf_counter()
+    try:
+        # No terminal on stdin, so actrak skips existing files instead of prompting
+        completed = subprocess.run([sys.executable, str(PIPELINE_SCRIPT)] + pipeline_args,
+                                   env=env, cwd=SCRIPT_DIR, stdin=subprocess.DEVNULL, text=True,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        result['output'] = completed.stdout
+        result['success'] = completed.returncode == 0
+        if not result['success']:
+            result['error'] = f"pipeline exited with {completed.returncode}"
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - start
+
+    if log_dir:
+        # Include the parent directory so team1/Vault and team2/Vault don't collide
+        log_name = '_'.join(Path(vault_path).resolve().parts[-2:])
+        log_file = Path(log_dir) / f"{log_name}.log"
+        try:
+            log_file.write_text(result['output'], encoding='utf-8')
+        except Exception as e:
+            print(f"⚠️  Could not save log for {vault_path}: {e}")
+
+    return result
+
+
+def run_vaults(vaults, pipeline_args, jobs=DEFAULT_JOBS, log_dir=None):
+    """Run every vault with at most jobs pipelines at a time; results keep the order given"""
+    if log_dir:
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = [executor.submit(run_vault, vault, pipeline_args, log_dir) for vault in vaults]
+        for future in as_completed(futures):
+            result = future.result()
+            status = "✅" if result['success'] else "❌"
+            print(f"{status} {result['vault']} ({result['seconds']:.2f}s)")
+    return [future.result() for future in futures]
+
+
+def print_summary(results, elapsed, verbose=False):
+    failed = [result for result in results if not result['success']]
+
+    print(f"\n📊 Summary: {len(results) - len(failed)}/{len(results)} vaults succeeded in {elapsed:.2f}s")
+    for result in sorted(results, key=lambda result: result['seconds'], reverse=True):
+        status = "✅" if result['success'] else "❌"
+        print(f"   {status} {result['seconds']:7.2f}s  {result['vault']}")
+
+    for result in failed:
+        print(f"\n❌ {result['vault']}: {result['error']}")
+        if verbose and result['output']:
+            print(result['output'].rstrip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the task manager pipeline for several vaults at once")
+    parser.add_argument('vaults', nargs='*', help="vault directories")
+    parser.add_argument('--registry', metavar='FILE',
+                        help="file listing one vault path per line (or set OBSIDIAN_VAULT_REGISTRY)")
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS, metavar='N',
+                        help=f"run at most N vaults at a time (default: {DEFAULT_JOBS})")
+    parser.add_argument('--log-dir', metavar='DIR', help="save each vault's pipeline output to DIR")
+    parser.add_argument('--verbose', '-v', action='store_true', help="print the output of failed vaults")
+    parser.add_argument('--rebuild', action='store_true', help="passed on to pipeline.py")
+    parser.add_argument('--workers', type=int, metavar='N', help="passed on to pipeline.py")
+    args = parser.parse_args()
+
+    vaults = list(args.vaults)
+    registry = args.registry or get_setting('OBSIDIAN_VAULT_REGISTRY')
+    if registry:
+        try:
+            vaults.extend(read_registry(registry))
+        except Exception as e:
+            print(f"❌ Error reading vault registry {registry}: {e}")
+            sys.exit(1)
+
+    # Keep the first occurrence of each vault
+    vaults = list(dict.fromkeys(vaults))
+    if not vaults:
+        print("❌ No vaults given. Pass vault paths or --registry FILE.")
+        sys.exit(1)
+
+    pipeline_args = []
+    if args.rebuild:
+        pipeline_args.append('--rebuild')
+    if args.workers:
+        pipeline_args.extend(['--workers', str(args.workers)])
+
+    print(f"🚀 Running {len(vaults)} vaults, {max(1, args.jobs)} at a time")
+    start = time.perf_counter()
+    results = run_vaults(vaults, pipeline_args, args.jobs, args.log_dir)
+    print_summary(results, time.perf_counter() - start, args.verbose)
+
+    if any(not result['success'] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Note Index
+Maps note names to their .md files anywhere in the vault, built with a
+single recursive os.scandir walk so [[links]] resolve without a stat call
+per lookup. Names also match when they differ only in case or in using
+spaces, underscores or hyphens between words.
+"""
+
+import os
+import re
+from collections import deque
+from pathlib import Path
+
+
+NOTE_SUFFIX = '.md'
+
+# Spaces, underscores and hyphens are interchangeable in note names
+SEPARATOR_PATTERN = re.compile(r'[\s_-]+')
+
+
+def loose_key(name):
+    """Case- and separator-insensitive form of a note name"""
+    return SEPARATOR_PATTERN.sub(' ', name).strip().casefold()
+
+
+def link_target(link):
+    """The note name of a [[link]], without its |alias or #heading"""
+    return link.split('|', 1)[0].split('#', 1)[0].strip()
+
+
+class NoteIndex:
+    def __init__(self, obsidian_path):
+        self.obsidian_path = Path(obsidian_path)
+        self.by_relative = {}  # {"folder/Note": path}
+        self.by_name = {}  # {"Note": path}
+        self.by_key = {}  # {loose_key("Note"): path}
+
+    def scan(self):
+        """Walk the vault once, breadth first so notes nearer the root win name clashes"""
+        pending = deque([self.obsidian_path])
+        while pending:
+            directory = pending.popleft()
+            try:
+                with os.scandir(directory) as entries:
+                    entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError:
+                continue
+
+            for entry in entries:
+                # Skip .obsidian, .trash, .task-manager and other hidden folders
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(Path(entry.path))
+                elif entry.name.endswith(NOTE_SUFFIX):
+                    self.add(Path(entry.path))
+        return self
+
+    def add(self, path):
+        """Index a note, keeping any earlier note with the same name"""
+        path = Path(path)
+        relative = path.relative_to(self.obsidian_path).with_suffix('').as_posix()
+        self.by_relative.setdefault(relative, path)
+        self.by_name.setdefault(path.stem, path)
+        self.by_key.setdefault(loose_key(path.stem), path)
+
+    def resolve(self, link):
+        """Return the note a link points to, or None if there is no such note"""
+        name = link_target(link)
+        if name.endswith(NOTE_SUFFIX):
+            name = name[:-len(NOTE_SUFFIX)]
+
+        if '/' in name:
+            path = self.by_relative.get(name)
+            if path is not None:
+                return path
+            name = name.rsplit('/', 1)[1]
+
+        return self.by_name.get(name) or self.by_key.get(loose_key(name))
@@ -1,195 +1,257 @@
+import argparse
+import io
 import os
 import re
-from datetime import datetime
-from pathlib import Path
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from config import get_obsidian_path
+from vault import VaultSnapshot
+from checkpoint import CheckpointManifest
+from parse_cache import MISSING, content_hash
+from taskparse import parse_tasks, opportunity_link
+from note_index import link_target
+from metrics import metrics, configure as configure_metrics
+from locks import lock_resources, LockTimeout, DAILY_NOTES, OPPORTUNITY_NOTES
+from daily_archive import DailyArchive, ARCHIVE_DIR_NAME
 
-def get_daily_files(daily_logs_dir):
-    """Get all daily files in YYYY-MM-DD.md format from the DailyLogs directory."""
-    daily_logs_path = Path(daily_logs_dir)
-    
-    if not daily_logs_path.exists():
-        print(f"Daily logs directory does not exist: {daily_logs_dir}")
+# Files this stage reads and writes, for the pipeline scheduler and the run locks
+STAGE_READS = (DAILY_NOTES, OPPORTUNITY_NOTES)
+STAGE_WRITES = (OPPORTUNITY_NOTES,)
+
+CHECKPOINT_FILE = 'oplog_checkpoint.json'
+
+# An activity line in an opportunity file: "- [ ] text", "- [x] text" or "- text"
+ACTIVITY_LINE_PATTERN = re.compile(r'^\s*- (?:\[[ xX]\]\s*)?(.+?)\s*$')
+
+def get_daily_files(vault):
+    """Get all daily files in YYYY-MM-DD.md format from the vault, newest first."""
+    if not vault.exists():
+        print(f"Daily logs directory does not exist: {vault.obsidian_path}")
         return []
     
-    # Pattern for daily files YYYY-MM-DD.md
-    date_pattern = re.compile(r'^\d{4}-\d{2}-\d{2}\.md$')
-    
-    daily_files = []
-    for file in daily_logs_path.iterdir():
-        if file.is_file() and date_pattern.match(file.name):
-            daily_files.append(file)
-    
-    # Sort files by date (newest first)
-    daily_files.sort(reverse=True)
-    return daily_files
-
-def extract_opportunity_link(text):
-    """Extract opportunity name from [[Opportunity Name]] format."""
-    match = re.search(r'\[\[([^\]]+)\]\]', text)
-    return match.group(1) if match else None
+    return vault.daily_files()
 
 def parse_completed_activities(lines):
     """Parse completed activities under opportunity parent records."""
+    return extract_completed_activities(parse_tasks(lines))
+
+def extract_completed_activities(tree):
+    """Collect completed activities under top-level [[Opportunity]] tasks from a task tree."""
     opportunity_activities = {}  # {opportunity_name: [activities]}
-    hierarchy_stack = {}  # {depth: task_text}
-    current_opportunity = None
     
-    for line in lines:
-        stripped_line = line.lstrip()
-        indent_level = len(line) - len(stripped_line)
+    for node in tree.nodes:
+        # Top-level tasks with a [[link]] are opportunities
+        opportunity = opportunity_link(node)
+        if node.parent is None:
+            if opportunity:
+                opportunity_activities.setdefault(opportunity, [])
+            continue
         
-        # Check if this is a task line
-        if re.match(r'^- \[[x ]\]', stripped_line):
-            is_completed = stripped_line.startswith('- [x]')
-            task_text = re.sub(r'^- \[[x ]\]\s*', '', stripped_line)
-            
-            # Calculate depth
-            if line.startswith('\t'):
-                depth = len(line) - len(line.lstrip('\t'))
-            else:
-                leading_spaces = indent_level
-                if leading_spaces >= 4:
-                    depth = leading_spaces // 4
-                elif leading_spaces >= 2:
-                    depth = leading_spaces // 2
-                elif leading_spaces >= 1:
-                    depth = leading_spaces
-                else:
-                    depth = 0
-            
-            # Store this task at its depth level
-            hierarchy_stack[depth] = task_text
-            
-            # Remove deeper levels
-            keys_to_remove = [k for k in hierarchy_stack.keys() if k > depth]
-            for k in keys_to_remove:
-                del hierarchy_stack[k]
-            
-            # Check if this is a top-level opportunity (depth 0)
-            if depth == 0:
-                opportunity_name = extract_opportunity_link(task_text)
-                if opportunity_name:
-                    current_opportunity = opportunity_name
-                    if current_opportunity not in opportunity_activities:
-                        opportunity_activities[current_opportunity] = []
-            
-            # If this is a completed task and we're under an opportunity
-            if is_completed and current_opportunity and depth > 0:
-                # Build hierarchy from level 0 to current depth, excluding the opportunity itself
-                hierarchy_parts = []
-                for level in sorted([k for k in hierarchy_stack.keys() if k > 0]):
-                    if hierarchy_stack[level].strip():
-                        hierarchy_parts.append(hierarchy_stack[level])
-                
-                if hierarchy_parts:
-                    activity_text = ' - '.join(hierarchy_parts)
-                    opportunity_activities[current_opportunity].append(activity_text)
+        if not node.checked or opportunity is None:
+            continue
+        
+        # Build hierarchy below the opportunity down to this task
+        hierarchy_parts = [parent.text for parent in node.ancestors()[1:] if parent.text]
+        if node.text:
+            hierarchy_parts.append(node.text)
         
-        # Reset current opportunity if we hit a non-indented non-task line
-        elif not line.startswith(' ') and not line.startswith('\t') and stripped_line:
-            current_opportunity = None
+        if hierarchy_parts:
+            activity_text = ' - '.join(hierarchy_parts)
+            opportunity_activities[opportunity].append(activity_text)
     
     return opportunity_activities
 
-def get_opportunity_file_path(parent_dir, opportunity_name):
+def get_opportunity_file_path(vault, opportunity_name):
     """Get the file path for an opportunity."""
-    # Try common file naming patterns
-    possible_names = [
-        f"{opportunity_name}.md",
-        f"{opportunity_name.replace(' ', '_')}.md",
-        f"{opportunity_name.replace(' ', '-')}.md"
-    ]
+    # Look the note up anywhere in the vault, allowing for case and space/underscore/hyphen differences
+    file_path = vault.note_index.resolve(opportunity_name)
+    if file_path is not None:
+        return file_path
     
-    parent_path = Path(parent_dir)
+    # If file doesn't exist, create it in the vault root, named after the note the link points to
+    return vault.obsidian_path / f"{link_target(opportunity_name)}.md"
+
+def normalize_activity(activity_text):
+    """Normalize activity text for duplicate detection (case and whitespace-insensitive)."""
+    return ' '.join(activity_text.split()).lower()
+
+class ActivityIndex:
+    """Normalized activity keys already present in each opportunity file, loaded once per run."""
     
-    for name in possible_names:
-        file_path = parent_path / name
-        if file_path.exists():
-            return file_path
+    def __init__(self, vault):
+        self.vault = vault
+        self._keys = {}  # {file_path: set of normalized activities}
+        self._needs_newline = {}  # {file_path: True if the file doesn't end with a newline}
     
-    # If file doesn't exist, create it with the first naming pattern
-    return parent_path / possible_names[0]
-
-def check_activity_exists(file_path, activity_text):
-    """Check if an activity already exists in the opportunity file."""
-    if not file_path.exists():
-        return False
+    def _load(self, file_path):
+        keys = set()
+        needs_newline = False
+        
+        if self.vault.file_exists(file_path):
+            try:
+                content = self.vault.read_text(file_path)
+                for line in content.split('\n'):
+                    match = ACTIVITY_LINE_PATTERN.match(line)
+                    if match:
+                        keys.add(normalize_activity(match.group(1)))
+                needs_newline = bool(content) and not content.endswith('\n')
+            except Exception as e:
+                print(f"Error reading {file_path}: {e}")
+        
+        self._keys[file_path] = keys
+        self._needs_newline[file_path] = needs_newline
     
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-            # Check if the exact activity text exists (case-insensitive)
-            return activity_text.lower() in content.lower()
-    except Exception as e:
-        print(f"Error reading {file_path}: {e}")
-        return False
-
-def add_activities_to_opportunity(file_path, opportunity_name, activities, date):
-    """Add completed activities to an opportunity file."""
-    if not activities:
-        return
+    def contains(self, file_path, activity_text):
+        """Check if an activity line already exists in the opportunity file."""
+        if file_path not in self._keys:
+            self._load(file_path)
+        return normalize_activity(activity_text) in self._keys[file_path]
     
-    # Filter out activities that already exist
-    new_activities = [activity for activity in activities if not check_activity_exists(file_path, activity)]
+    def add(self, file_path, activity_text):
+        """Record an activity that is being appended to the opportunity file."""
+        if file_path not in self._keys:
+            self._load(file_path)
+        self._keys[file_path].add(normalize_activity(activity_text))
     
-    if not new_activities:
-        print(f"All activities for {opportunity_name} already exist in the file")
+    def needs_newline(self, file_path):
+        """Check if the file needs a newline before anything is appended to it."""
+        if file_path not in self._keys:
+            self._load(file_path)
+        return self._needs_newline[file_path]
+    
+    def mark_appended(self, file_path):
+        self._needs_newline[file_path] = False
+
+def filter_new_activities(activity_index, file_path, activities):
+    """Return the activities not yet in the opportunity file, recording them in the index."""
+    new_activities = []
+    for activity in activities:
+        if not activity_index.contains(file_path, activity):
+            activity_index.add(file_path, activity)
+            new_activities.append(activity)
+    
+    return new_activities
+
+def add_activities_to_opportunity(vault, activity_index, file_path, opportunity_name, activities_by_date):
+    """Add completed activities to an opportunity file in one write, one section per date in date order."""
+    if not activities_by_date:
         return
     
     try:
-        # Read existing content if file exists
-        existing_content = ""
-        if file_path.exists():
-            with open(file_path, 'r', encoding='utf-8') as file:
-                existing_content = file.read()
-        
         # Append new activities
-        with open(file_path, 'a', encoding='utf-8') as file:
-            if existing_content and not existing_content.endswith('\n'):
-                file.write('\n')
-            
-            file.write(f"\n## Completed Activities - {date}\n")
-            for activity in new_activities:
-                file.write(f"- [ ] {activity}\n")
-            file.write("\n")
+        new_content = []
+        if activity_index.needs_newline(file_path):
+            new_content.append('\n')
+        
+        for date in sorted(activities_by_date):
+            new_content.append(f"\n## Completed Activities - {date}\n")
+            for activity in activities_by_date[date]:
+                new_content.append(f"- [ ] {activity}\n")
+            new_content.append("\n")
+        
+        vault.append_text(file_path, ''.join(new_content))
+        activity_index.mark_appended(file_path)
+        for date in sorted(activities_by_date):
+            for activity in activities_by_date[date]:
+                vault.history.add_activity(date, opportunity_name, activity, file_path)
         
-        print(f"Added {len(new_activities)} new activities to {opportunity_name}")
-        for activity in new_activities:
-            print(f"  - {activity}")
+        activity_count = sum(len(activities) for activities in activities_by_date.values())
+        metrics.count('items_appended', activity_count)
+        print(f"Added {activity_count} new activities to {opportunity_name}")
+        for date in sorted(activities_by_date):
+            for activity in activities_by_date[date]:
+                print(f"  - {date}: {activity}")
     
     except Exception as e:
         print(f"Error writing to {file_path}: {e}")
 
-def process_daily_file(file_path):
+def process_daily_file(vault, file_path):
     """Process a single daily file and extract opportunity activities."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-        
-        # Remove newline characters but preserve indentation
-        lines = [line.rstrip('\n') for line in lines]
-        
         # Parse completed activities
-        opportunity_activities = parse_completed_activities(lines)
+        with metrics.file_span(file_path):
+            opportunity_activities = vault.cached_parse(file_path, 'opportunity_activities',
+                                                        extract_completed_activities)
         
         return opportunity_activities
     
     except Exception as e:
         print(f"Error processing file {file_path}: {e}")
-        return {}
+        return None
 
-def main():
-    # Configuration - Load from environment file
-    parent_directory = get_obsidian_path()
-    daily_logs_directory = parent_directory  # Assuming daily logs are in the main vault
+def parse_daily_file_worker(file_path):
+    """Read and parse one daily file in a worker process: (activities, content hash, stat, error)."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            stat = os.fstat(file.fileno())
+            text = file.read()
+        
+        tree = parse_tasks(io.StringIO(text).readlines())
+        return extract_completed_activities(tree), content_hash(text), (stat.st_mtime_ns, stat.st_size), None
+    
+    except Exception as e:
+        return None, None, None, str(e)
+
+def daily_file_state(vault, file_path):
+    """Checkpoint state of a daily file, taken before it is parsed so an edit made mid-run shows next run."""
+    try:
+        return vault.file_state(file_path)
+    except OSError:
+        return None
+
+def iter_daily_file_activities(vault, daily_files, workers=1):
+    """Yield (daily_file, opportunity_activities, checkpoint state) in the order of daily_files.
+    
+    With more than one worker the files are parsed in a process pool; results are
+    still merged in input order so the output matches a serial run exactly.
+    """
+    if workers <= 1:
+        for daily_file in daily_files:
+            state = daily_file_state(vault, daily_file)
+            yield daily_file, process_daily_file(vault, daily_file), state
+        return
+    
+    # Only files missing from the parse cache go to the workers; files with
+    # staged edits only exist in this process's snapshot
+    cached = {}
+    for daily_file in daily_files:
+        result, state = vault.cached_result(daily_file, 'opportunity_activities')
+        if result is not MISSING:
+            cached[daily_file] = result, state
+    disk_files = [daily_file for daily_file in daily_files
+                  if daily_file not in cached and not vault.has_staged_write(daily_file)]
+    
+    results = {}
+    if len(disk_files) > 1:
+        chunksize = max(1, len(disk_files) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = dict(zip(disk_files, executor.map(parse_daily_file_worker, disk_files, chunksize=chunksize)))
     
+    for daily_file in daily_files:
+        if daily_file in cached:
+            yield daily_file, *cached[daily_file]
+            continue
+        if daily_file not in results:
+            state = daily_file_state(vault, daily_file)
+            yield daily_file, process_daily_file(vault, daily_file), state
+            continue
+        
+        opportunity_activities, digest, stat, error = results[daily_file]
+        if error is not None:
+            print(f"Error processing file {daily_file}: {error}")
+            yield daily_file, None, None
+            continue
+        vault.store_result(daily_file, 'opportunity_activities', opportunity_activities, digest, *stat)
+        yield daily_file, opportunity_activities, (*stat, digest)
+
+def process_vault(vault, rebuild=False, workers=1):
+    """Add completed activities from new or changed daily files to their opportunity files."""
     # Get all daily files
-    daily_files = get_daily_files(parent_directory)
+    daily_files = get_daily_files(vault)
     
     if not daily_files:
         print("No daily files found in the DailyLogs directory")
-        return
+        return True
     
     print(f"Found {len(daily_files)} daily files:")
     for file in daily_files[:10]:  # Show first 10 files
@@ -197,30 +259,82 @@ def main():
     if len(daily_files) > 10:
         print(f"  ... and {len(daily_files) - 10} more files")
     
-    # Process each daily file
+    # Skip daily files that have not changed since the last run
+    checkpoint = CheckpointManifest(vault, CHECKPOINT_FILE)
+    if rebuild:
+        print("Rebuilding: ignoring checkpoint and processing every daily file")
+        checkpoint.clear()
+    
+    changed_files = [daily_file for daily_file in daily_files if not checkpoint.is_current(daily_file)]
+    print(f"{len(changed_files)} daily files are new or changed since the last run")
+    
+    # Archived notes are checkpointed under their old vault path, by content hash
+    archive = DailyArchive(vault)
+    archived_days = archive.dates()
+    changed_archived = [day for day in archived_days
+                        if not checkpoint.is_current_digest(vault.daily_file_path(day), archive.note_hash(day))]
+    if archived_days:
+        print(f"{len(archived_days)} older daily files are archived in {ARCHIVE_DIR_NAME}/, "
+              f"{len(changed_archived)} not processed yet")
+    
+    # Process each daily file, collecting new activities for a single write per opportunity file
     all_opportunity_activities = {}
+    activity_index = ActivityIndex(vault)
+    pending_activities = {}  # {opportunity_file: (opportunity_name, {date: [activities]})}
     
-    for daily_file in daily_files:
+    if workers > 1 and len(changed_files) > 1:
+        print(f"Parsing with {workers} worker processes")
+    
+    def queue_activities(date, opportunity_activities):
+        """Queue a daily note's activities that aren't in their opportunity files yet"""
+        for opportunity_name, activities in (opportunity_activities or {}).items():
+            print(f"Found {len(activities)} completed activities for '{opportunity_name}':")
+            
+            # Get opportunity file path
+            opportunity_file = get_opportunity_file_path(vault, opportunity_name)
+            
+            # Queue activities that aren't in the opportunity file yet
+            new_activities = filter_new_activities(activity_index, opportunity_file, activities)
+            metrics.count('items_extracted', len(activities))
+            metrics.count('items_deduplicated', len(activities) - len(new_activities))
+            if new_activities:
+                _, activities_by_date = pending_activities.setdefault(opportunity_file, (opportunity_name, {}))
+                activities_by_date.setdefault(date, []).extend(new_activities)
+            else:
+                print(f"All activities for {opportunity_name} already exist in the file")
+            
+            # Track all activities for summary
+            if opportunity_name not in all_opportunity_activities:
+                all_opportunity_activities[opportunity_name] = []
+            all_opportunity_activities[opportunity_name].extend(activities)
+    
+    for daily_file, opportunity_activities, state in iter_daily_file_activities(vault, changed_files, workers):
         print(f"\nProcessing {daily_file.name}...")
         
-        opportunity_activities = process_daily_file(daily_file)
+        if opportunity_activities is not None:
+            checkpoint.record(daily_file, state)
         
-        if opportunity_activities:
-            date = daily_file.stem  # Gets filename without .md extension
-            
-            for opportunity_name, activities in opportunity_activities.items():
-                print(f"Found {len(activities)} completed activities for '{opportunity_name}':")
-                
-                # Get opportunity file path
-                opportunity_file = get_opportunity_file_path(parent_directory, opportunity_name)
-                
-                # Add activities to opportunity file
-                add_activities_to_opportunity(opportunity_file, opportunity_name, activities, date)
-                
-                # Track all activities for summary
-                if opportunity_name not in all_opportunity_activities:
-                    all_opportunity_activities[opportunity_name] = []
-                all_opportunity_activities[opportunity_name].extend(activities)
+        queue_activities(daily_file.stem, opportunity_activities)
+    
+    # Archived notes are decompressed one at a time, oldest last like the vault files
+    for day, lines in archive.iter_notes(changed_archived, newest_first=True):
+        print(f"\nProcessing {day}.md (archived)...")
+        checkpoint.record_digest(vault.daily_file_path(day), archive.note_hash(day))
+        queue_activities(day, extract_completed_activities(parse_tasks(lines)))
+    
+    # Write each opportunity file once
+    if pending_activities:
+        print()
+    for opportunity_file, (opportunity_name, activities_by_date) in pending_activities.items():
+        add_activities_to_opportunity(vault, activity_index, opportunity_file, opportunity_name, activities_by_date)
+    
+    checkpoint.prune(daily_files + [vault.daily_file_path(day) for day in archived_days])
+    checkpoint.save()
+    
+    # Keep the link graph current while the changed notes' task trees are still in memory
+    linked = vault.link_index.refresh(vault, archive)
+    if linked:
+        print(f"Indexed links in {linked} daily files")
     
     # Summary
     print(f"\n{'='*50}")
@@ -233,6 +347,38 @@ def main():
             print(f"  - {opportunity_name}: {len(activities)} activities")
     else:
         print("No completed activities found under opportunity records")
+    
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Add completed activities from daily files to opportunity files")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="ignore the checkpoint and reprocess every daily file")
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help="parse daily files in N worker processes (default: 1)")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="save a JSON report of timings and I/O counters (or set TASK_MANAGER_METRICS)")
+    parser.add_argument('--profile', metavar='DIR',
+                        help="save cProfile output to DIR (or set TASK_MANAGER_PROFILE)")
+    args = parser.parse_args()
+    
+    # Configuration - Load from environment file
+    parent_directory = get_obsidian_path()
+    
+    configure_metrics(args.metrics, args.profile)
+    try:
+        with lock_resources(parent_directory, STAGE_READS + STAGE_WRITES):
+            vault = VaultSnapshot(parent_directory)
+            with metrics.stage('oplog'):
+                success = process_vault(vault, rebuild=args.rebuild, workers=args.workers) and vault.flush()
+    except LockTimeout as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    metrics.write_report()
+    
+    if not success:
+        print("❌ Opportunity logging failed!")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+Parse Cache
+On-disk cache of what each stage extracts from a note: deeplogging's
+checked items, oplog's opportunity activities and actrak's open lines.
+Entries are keyed by the note's path, mtime and size, so warm runs answer
+unchanged notes without opening the markdown; when only the mtime moved,
+the content hash still matches and the parse is skipped.
+
+Stored with marshal (plain data only, nothing is executed on load) in the
+vault state folder. The file is capped in size and the least recently
+used notes are evicted first.
+"""
+
+import hashlib
+import marshal
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+# Bump when the stored results change shape so old caches are dropped
+CACHE_VERSION = 2
+DEFAULT_MAX_MB = 16
+
+# Files modified this recently may change again within the same mtime tick
+RACY_MTIME_SECONDS = 2
+
+# Returned by lookups that miss, since None can be a cached result
+MISSING = object()
+
+
+def content_hash(text):
+    """Hash file content for change detection"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ParseCache:
+    def __init__(self, cache_file, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.cache_file = Path(cache_file)
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # {name: [mtime_ns, size, hash, {kind: result}, bytes]}, oldest first
+        self.total_bytes = 0
+        self.dirty = False
+        self._lock = threading.RLock()  # stages running in parallel share the cache
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def load(self):
+        """Load the cache file; a missing, stale or corrupt file starts an empty cache"""
+        if not self.enabled or not self.cache_file.exists():
+            return self
+
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = marshal.load(f)
+            if data.get('version') != CACHE_VERSION:
+                return self
+            for name, mtime_ns, size, digest, results, nbytes in data['entries']:
+                self.entries[name] = [mtime_ns, size, digest, results, nbytes]
+                self.total_bytes += nbytes
+        except Exception:
+            self.entries.clear()
+            self.total_bytes = 0
+        return self
+
+    def lookup(self, name, mtime_ns, size, kind):
+        """Return a cached result for a file whose mtime and size are unchanged, or MISSING"""
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is None or entry[0] != mtime_ns or entry[1] != size or kind not in entry[3]:
+                return MISSING
+            self._touch(name)
+            return entry[3][kind]
+
+    def cached_hash(self, name, mtime_ns, size):
+        """Return the content hash recorded for a file whose mtime and size are unchanged, or None"""
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is None or entry[0] != mtime_ns or entry[1] != size:
+                return None
+            return entry[2]
+
+    def lookup_hash(self, name, digest, mtime_ns, size, kind):
+        """Return a cached result for unchanged content under a new mtime, or MISSING"""
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is None or entry[2] != digest or kind not in entry[3]:
+                return MISSING
+            if time.time() - mtime_ns / 1e9 > RACY_MTIME_SECONDS:
+                entry[0], entry[1] = mtime_ns, size
+                self.dirty = True
+            self._touch(name)
+            return entry[3][kind]
+
+    def _touch(self, name):
+        # Mark as most recently used; only a change of order needs saving
+        if next(reversed(self.entries)) != name:
+            self.entries.move_to_end(name)
+            self.dirty = True
+
+    def store(self, name, mtime_ns, size, digest, kind, result):
+        """Cache a stage's result for a file, evicting the least recently used files if needed"""
+        with self._lock:
+            if not self.enabled or time.time() - mtime_ns / 1e9 <= RACY_MTIME_SECONDS:
+                return
+
+            entry = self.entries.get(name)
+            if entry is not None and entry[2] == digest:
+                results = dict(entry[3])
+            else:
+                results = {}
+            results[kind] = result
+            self._put(name, [mtime_ns, size, digest, results, 0])
+            self.dirty = True
+
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= evicted[4]
+
+    def _put(self, name, entry):
+        old = self.entries.pop(name, None)
+        if old is not None:
+            self.total_bytes -= old[4]
+        entry[4] = len(name) + len(marshal.dumps(entry[3])) + 64
+        self.entries[name] = entry
+        self.total_bytes += entry[4]
+
+    def save(self):
+        """Write the cache if it changed, replacing the old file in one step"""
+        if not self.enabled or not self.dirty:
+            return
+
+        data = {
+            'version': CACHE_VERSION,
+            'entries': [[name] + entry for name, entry in self.entries.items()],
+        }
+        temp_file = self.cache_file.with_name(self.cache_file.name + '.tmp')
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_file, 'wb') as f:
+                marshal.dump(data, f)
+            os.replace(temp_file, self.cache_file)
+            self.dirty = False
+        except Exception as e:
+            print(f"⚠️  Could not save parse cache: {e}")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Pipeline Runner
+Runs deeplogging, task_logger, oplog and actrak in a single process
+The vault is scanned once, every stage shares the same in-memory snapshot,
+and each touched file is written once at the end of the run
+Stages that don't touch the same files run in parallel, and the run holds
+locks on the files it uses so overlapping runs wait for each other
+"""
+
+import argparse
+import os
+import sys
+import time
+from config import get_obsidian_path
+from vault import VaultSnapshot
+from metrics import metrics, configure as configure_metrics
+from scheduler import Stage, run_stages, stage_dependencies
+from locks import lock_resources, LockTimeout
+import deeplogging
+import task_logger
+import oplog
+import actrak
+
+
+def run_deeplogging(vault, args):
+    return deeplogging.TaskTracker(vault.obsidian_path, vault).process_latest_file(full=args.rebuild)
+
+
+def run_task_logger(vault, args):
+    return task_logger.TaskLogger(vault.obsidian_path, vault).process_tracker()
+
+
+def run_oplog(vault, args):
+    return oplog.process_vault(vault, rebuild=args.rebuild, workers=args.workers)
+
+
+def run_actrak(vault, args):
+    return actrak.process_latest_daily_file(vault, catch_up=args.catch_up, policy=args.existing)
+
+
+# Same order as daily_task_automation.bat; a stage waits for the earlier
+# ones that touch the same files, the others run alongside it
+STAGES = [
+    Stage('deeplogging', run_deeplogging, deeplogging.STAGE_READS, deeplogging.STAGE_WRITES),
+    Stage('task_logger', run_task_logger, task_logger.STAGE_READS, task_logger.STAGE_WRITES),
+    Stage('oplog', run_oplog, oplog.STAGE_READS, oplog.STAGE_WRITES),
+    Stage('actrak', run_actrak, actrak.STAGE_READS, actrak.STAGE_WRITES),
+]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run all task manager stages in one process")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="make oplog ignore its checkpoint and reprocess every daily file, "
+                             "and deeplogging check every checked item")
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help="parse oplog's daily files in N worker processes (default: 1)")
+    parser.add_argument('--serial', action='store_true',
+                        help="run the stages one after another instead of in parallel")
+    actrak.add_existing_arguments(parser)
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="save a JSON report of timings and I/O counters (or set TASK_MANAGER_METRICS)")
+    parser.add_argument('--profile', metavar='DIR',
+                        help="save cProfile output per stage to DIR (or set TASK_MANAGER_PROFILE)")
+    return parser.parse_args(argv)
+
+
+def run_pipeline(obsidian_path, args):
+    """Run every stage against one vault snapshot and flush the writes once"""
+    resources = set()
+    for stage in STAGES:
+        resources.update(stage.reads, stage.writes)
+
+    try:
+        with lock_resources(obsidian_path, resources):
+            return run_locked(obsidian_path, args)
+    except LockTimeout as e:
+        print(f"❌ {e}")
+        return False
+
+
+def run_locked(obsidian_path, args):
+    """Run the stages and flush, with the vault locks held"""
+    vault = VaultSnapshot(obsidian_path)
+
+    # cProfile can only profile one thread at a time, and actrak's overwrite
+    # prompt needs the terminal rather than a stage's buffered output
+    may_prompt = args.existing == 'ask' or (args.existing is None and sys.stdin.isatty())
+    parallel = not args.serial and metrics.profile_dir is None and not may_prompt
+    if parallel:
+        dependencies = stage_dependencies(STAGES)
+        for stage in STAGES:
+            after = f" (after {', '.join(dependencies[stage.name])})" if dependencies[stage.name] else ""
+            print(f"🧵 {stage.name}{after}")
+
+    def run_stage(stage):
+        print(f"\n▶️  Stage: {stage.name}")
+        start = time.perf_counter()
+        try:
+            with metrics.stage(stage.name):
+                success = stage.function(vault, args)
+        except Exception as e:
+            print(f"❌ Stage {stage.name} raised an error: {e}")
+            success = False
+
+        elapsed = time.perf_counter() - start
+        print(f"⏱️  {stage.name} finished in {elapsed:.2f}s")
+        return success
+
+    start = time.perf_counter()
+    results = run_stages(STAGES, run_stage, parallel=parallel)
+    failed_stages = [stage.name for stage in STAGES if not results[stage.name][0]]
+    if parallel:
+        print(f"\n⏱️  All stages finished in {time.perf_counter() - start:.2f}s")
+
+    pending_files = vault.pending_files()
+    with metrics.stage('flush'):
+        flushed = vault.flush()
+    if not flushed:
+        return False
+
+    print(f"\n💾 Wrote {len(pending_files)} files")
+    for path in pending_files:
+        print(f"   • {path.name}")
+
+    if failed_stages:
+        print(f"⚠️  Stages with problems: {', '.join(failed_stages)}")
+        return False
+
+    return True
+
+
+def main():
+    args = parse_args()
+
+    # Configuration - Load from environment file
+    obsidian_path = get_obsidian_path()
+
+    # Verify obsidian directory exists
+    if not os.path.exists(obsidian_path):
+        print(f"❌ Obsidian directory not found: {obsidian_path}")
+        sys.exit(1)
+
+    configure_metrics(args.metrics, args.profile)
+    success = run_pipeline(obsidian_path, args)
+    metrics.write_report()
+
+    if success:
+        print("✨ Pipeline completed successfully!")
+    else:
+        print("❌ Pipeline completed with errors!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+History Query
+Searches the SQLite history index of logged items by date range,
+opportunity and text, e.g. what was done on Project X last quarter:
+
+    python query.py --opportunity "Project X" --since 2025-04-01 --until 2025-06-30
+
+The index is built from the logger and the opportunity files on first
+use, and kept up to date by task_logger and oplog after that.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from config import get_obsidian_path
+from vault import VaultSnapshot
+from history_index import LOGGER_KIND, ACTIVITY_KIND
+from logger_files import LoggerLayout
+
+
+def print_entries(entries):
+    for entry in entries:
+        opportunity = f"[[{entry['opportunity']}]] " if entry['opportunity'] else ""
+        print(f"{entry['date']}  {opportunity}{entry['path']}  ({entry['file']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the history of logged items")
+    parser.add_argument('--since', metavar='YYYY-MM-DD', help="only items on or after this date")
+    parser.add_argument('--until', metavar='YYYY-MM-DD', help="only items on or before this date")
+    parser.add_argument('--opportunity', '-o', help="only items for this opportunity (case-insensitive)")
+    parser.add_argument('--text', '-t', help="only items containing these words (word prefixes match)")
+    parser.add_argument('--kind', choices=[LOGGER_KIND, ACTIVITY_KIND],
+                        help="only logger entries or only opportunity activities")
+    parser.add_argument('--limit', type=int, help="show at most this many items")
+    parser.add_argument('--json', action='store_true', help="print the items as JSON")
+    parser.add_argument('--rebuild', action='store_true', help="rebuild the index from the markdown first")
+    args = parser.parse_args()
+
+    # Configuration - Load from environment file
+    obsidian_path = get_obsidian_path()
+
+    # Verify obsidian directory exists
+    if not os.path.exists(obsidian_path):
+        print(f"❌ Obsidian directory not found: {obsidian_path}")
+        sys.exit(1)
+
+    vault = VaultSnapshot(obsidian_path)
+    history = vault.history
+
+    if args.rebuild or not history.is_built():
+        start = time.perf_counter()
+        count = history.rebuild(vault, LoggerLayout(vault).files())
+        print(f"🗂️  Indexed {count} logged items in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+    start = time.perf_counter()
+    entries = history.query(args.since, args.until, args.opportunity, args.text, args.kind, args.limit)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps(entries, indent=2))
+    else:
+        print_entries(entries)
+    print(f"🔎 {len(entries)} items in {elapsed:.1f}ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
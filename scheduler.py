@@ -0,0 +1,102 @@
+"""
+Stage Scheduler
+Runs pipeline stages concurrently where they don't conflict. Each stage
+declares the resources (see locks.py) it reads and writes; a stage waits
+for every earlier stage that writes something it uses or uses something
+it writes, so conflicting stages keep their listed order and the rest
+run side by side in threads.
+
+Output is buffered per stage and printed when the stage finishes, so
+parallel stages don't interleave their lines.
+"""
+
+import io
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+Stage = namedtuple('Stage', 'name function reads writes')
+
+
+def conflicts(first, second):
+    """Check if two stages touch the same resource and at least one of them writes it"""
+    first_uses = set(first.reads) | set(first.writes)
+    second_uses = set(second.reads) | set(second.writes)
+    return bool(set(first.writes) & second_uses or set(second.writes) & first_uses)
+
+
+def stage_dependencies(stages):
+    """Map each stage name to the earlier stages it has to wait for"""
+    return {stage.name: [earlier.name for earlier in stages[:index] if conflicts(earlier, stage)]
+            for index, stage in enumerate(stages)}
+
+
+class _ThreadOutput(io.TextIOBase):
+    """sys.stdout stand-in that sends each stage thread's output to its own buffer"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def run_stages(stages, run_stage, parallel=True):
+    """Call run_stage(stage) for every stage, respecting their dependencies
+
+    Returns {stage name: (result, seconds)}; an exception is the stage's result.
+    """
+    results = {}
+
+    def timed(stage):
+        start = time.perf_counter()
+        try:
+            result = run_stage(stage)
+        except Exception as e:
+            result = e
+        return result, time.perf_counter() - start
+
+    if not parallel:
+        for stage in stages:
+            results[stage.name] = timed(stage)
+        return results
+
+    dependencies = stage_dependencies(stages)
+    output = _ThreadOutput(sys.stdout)
+
+    def buffered(stage):
+        output.local.buffer = io.StringIO()
+        try:
+            return timed(stage)
+        finally:
+            text = output.local.buffer.getvalue()
+            output.local.buffer = None
+            output.stream.write(text)
+
+    pending = list(stages)
+    running = {}
+    original_stdout = sys.stdout
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=len(stages) or 1) as executor:
+            while pending or running:
+                for stage in list(pending):
+                    if all(name in results for name in dependencies[stage.name]):
+                        pending.remove(stage)
+                        running[executor.submit(buffered, stage)] = stage
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future).name] = future.result()
+    finally:
+        sys.stdout = original_stdout
+
+    return results
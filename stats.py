@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Completion Stats
+Per-opportunity throughput from the daily notes (archived ones
+included): completions per day and week, rolling averages, and lead
+time from a task's first appearance in a daily note to the day it was
+checked. For example, the last quarter with a weekly series:
+
+    python stats.py --since 2025-04-01 --until 2025-06-30 --weekly
+
+The notes are streamed once, oldest first. Only open tasks and tasks
+seen checked in the last year are kept in memory, as 64-bit hashes, and
+counts go into fixed-size arrays per opportunity, so memory stays flat
+however many years are covered.
+Unchanged notes come from the parse cache.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from array import array
+from datetime import date, timedelta
+from config import get_obsidian_path
+from vault import VaultSnapshot
+from daily_archive import DailyArchive
+from note_index import loose_key, link_target
+from taskparse import parse_tasks, opportunity_link
+
+
+# Lead times are counted exactly up to this many days; longer ones share the last bucket
+MAX_LEAD_DAYS = 365
+
+# Open tasks not seen for this long are treated as abandoned and forgotten
+STALE_DAYS = 365
+
+# Days between sweeps for abandoned tasks
+PURGE_INTERVAL_DAYS = 30
+
+DEFAULT_ROLLING_DAYS = 28
+NO_OPPORTUNITY = "(no opportunity)"
+
+
+def task_key(path):
+    """64-bit hash of a task's full "parent - task" path, its identity from day to day"""
+    return int.from_bytes(hashlib.blake2b(path.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def task_records(tree):
+    """(task key, opportunity, checked) for every task in a note"""
+    records = []
+    for node in tree.nodes:
+        if not node.text:
+            continue
+        path = ' - '.join([parent.text for parent in node.ancestors() if parent.text] + [node.text])
+        records.append((task_key(path), opportunity_link(node) or '', node.checked))
+    return records
+
+
+def iter_note_records(vault, archive, until=None):
+    """Yield (date, task records) for every daily note up to until, oldest first"""
+    root_days = set(vault.daily_index.dates)
+    archived_days = set(archive.dates()) - root_days
+    days = sorted(root_days | archived_days)
+    if until:
+        days = [day for day in days if day <= until]
+
+    # Archived notes are read month by month, as the walk reaches them
+    pending_archived = iter(archive.iter_notes([day for day in days if day in archived_days]))
+    for day in days:
+        if day in archived_days:
+            archived_day, lines = next(pending_archived)
+            yield archived_day, task_records(parse_tasks(lines))
+        else:
+            yield day, vault.cached_parse(vault.daily_file_path(day), 'task_records', task_records)
+
+
+class OpportunityCounters:
+    __slots__ = ('daily', 'lead_days', 'lead_total', 'completed')
+
+    def __init__(self, days):
+        self.daily = array('I', bytes(4 * days))  # completions per day of the window
+        self.lead_days = array('I', bytes(4 * (MAX_LEAD_DAYS + 1)))  # lead time histogram
+        self.lead_total = 0
+        self.completed = 0
+
+
+class VelocityStats:
+    def __init__(self, since, until):
+        self.since = since
+        self.until = until
+        self.first_day = since.toordinal()
+        self.days = (until - since).days + 1
+        self.by_opportunity = {}  # {opportunity: OpportunityCounters}
+        self.open_tasks = {}  # {task key: ordinal of the day it was first seen}
+        self.last_seen = {}  # {task key: ordinal of the last day it was seen open}
+        self.completed_tasks = {}  # {task key: ordinal of the last day it was seen checked}
+        self.last_purge = None  # ordinal of the last sweep for abandoned tasks
+        self.notes_read = 0
+
+    def counters(self, opportunity):
+        counters = self.by_opportunity.get(opportunity)
+        if counters is None:
+            counters = self.by_opportunity[opportunity] = OpportunityCounters(self.days)
+        return counters
+
+    def add_note(self, day, records):
+        """Count one daily note: open tasks start their clock, tasks complete on the first note they are checked in"""
+        ordinal = date.fromisoformat(day).toordinal()
+        in_window = 0 <= ordinal - self.first_day < self.days
+        self.notes_read += 1
+
+        for key, opportunity, checked in records:
+            if not checked:
+                # Unchecked again after completing: the next check is a new completion
+                self.completed_tasks.pop(key, None)
+                self.open_tasks.setdefault(key, ordinal)
+                self.last_seen[key] = ordinal
+                continue
+
+            # Still checked in a later note: already counted
+            already_completed = key in self.completed_tasks
+            self.completed_tasks[key] = ordinal
+            if already_completed:
+                continue
+
+            first_seen = self.open_tasks.pop(key, ordinal)
+            self.last_seen.pop(key, None)
+            if not in_window:
+                continue
+            counters = self.counters(opportunity)
+            lead = ordinal - first_seen
+            counters.daily[ordinal - self.first_day] += 1
+            counters.lead_days[min(lead, MAX_LEAD_DAYS)] += 1
+            counters.lead_total += lead
+            counters.completed += 1
+
+        if self.last_purge is None:
+            self.last_purge = ordinal
+        elif ordinal - self.last_purge >= PURGE_INTERVAL_DAYS:
+            self.forget_stale(ordinal)
+            self.last_purge = ordinal
+
+    def forget_stale(self, ordinal):
+        """Drop open and completed tasks that haven't appeared for STALE_DAYS"""
+        stale = [key for key, seen in self.last_seen.items() if ordinal - seen > STALE_DAYS]
+        for key in stale:
+            del self.last_seen[key]
+            self.open_tasks.pop(key, None)
+        for key in [key for key, seen in self.completed_tasks.items() if ordinal - seen > STALE_DAYS]:
+            del self.completed_tasks[key]
+
+    def summary(self, counters, rolling_days):
+        """Throughput and lead time figures for one set of counters"""
+        weeks = self.days / 7
+        rolling = min(rolling_days, self.days)
+        return {
+            'completed': counters.completed,
+            'per_day': counters.completed / self.days,
+            'per_week': counters.completed / weeks,
+            'rolling_per_day': sum(counters.daily[-rolling:]) / rolling,
+            'lead_mean': counters.lead_total / counters.completed if counters.completed else None,
+            'lead_median': lead_percentile(counters.lead_days, 0.5),
+            'lead_p90': lead_percentile(counters.lead_days, 0.9),
+        }
+
+    def weekly(self, counters, rolling_days):
+        """Completions per week of the window with a trailing rolling average per day"""
+        series = []
+        running = 0
+        for start in range(0, self.days, 7):
+            end = min(start + 7, self.days)
+            done = sum(counters.daily[start:end])
+            window_start = max(0, end - rolling_days)
+            running = sum(counters.daily[window_start:end]) / (end - window_start)
+            series.append({
+                'week': (self.since + timedelta(days=start)).isoformat(),
+                'completed': done,
+                'rolling_per_day': running,
+            })
+        return series
+
+    def total(self):
+        """Counters summed over every opportunity"""
+        total = OpportunityCounters(self.days)
+        for counters in self.by_opportunity.values():
+            for index, value in enumerate(counters.daily):
+                if value:
+                    total.daily[index] += value
+            for index, value in enumerate(counters.lead_days):
+                if value:
+                    total.lead_days[index] += value
+            total.lead_total += counters.lead_total
+            total.completed += counters.completed
+        return total
+
+
+def lead_percentile(histogram, share):
+    """Lead time in days at a share of the completions, from the histogram"""
+    count = sum(histogram)
+    if not count:
+        return None
+    target = share * count
+    running = 0
+    for days, value in enumerate(histogram):
+        running += value
+        if running >= target:
+            return days
+    return MAX_LEAD_DAYS
+
+
+def format_days(value):
+    if value is None:
+        return '-'
+    if value >= MAX_LEAD_DAYS:
+        return f"{MAX_LEAD_DAYS}d+"
+    return f"{value:.0f}d" if isinstance(value, int) else f"{value:.1f}d"
+
+
+def print_report(stats, rows, rolling_days, weekly):
+    print(f"📈 Completions {stats.since} → {stats.until} ({stats.days} days)\n")
+    rolling_days = min(rolling_days, stats.days)
+    header = f"{'Opportunity':<32} {'Done':>6} {'/day':>6} {'/week':>6} {f'{rolling_days}d avg':>8} " \
+             f"{'Lead avg':>9} {'median':>7} {'p90':>6}"
+    print(header)
+    print('-' * len(header))
+    for name, summary, _ in rows:
+        print(f"{name[:32]:<32} {summary['completed']:>6} {summary['per_day']:>6.2f} {summary['per_week']:>6.2f} "
+              f"{summary['rolling_per_day']:>8.2f} {format_days(summary['lead_mean']):>9} "
+              f"{format_days(summary['lead_median']):>7} {format_days(summary['lead_p90']):>6}")
+
+    if weekly:
+        for name, _, series in rows:
+            print(f"\n{name}: week, completed, {rolling_days}-day average per day")
+            for week in series:
+                print(f"   {week['week']}  {week['completed']:>4}  {week['rolling_per_day']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-opportunity completion throughput and lead times")
+    parser.add_argument('--since', metavar='YYYY-MM-DD', help="start of the window (default: 90 days before --until)")
+    parser.add_argument('--until', metavar='YYYY-MM-DD', help="end of the window (default: today)")
+    parser.add_argument('--opportunity', '-o', action='append',
+                        help="only this opportunity (case-insensitive, can be repeated)")
+    parser.add_argument('--top', type=int, help="only the N opportunities with the most completions")
+    parser.add_argument('--rolling', type=int, default=DEFAULT_ROLLING_DAYS, metavar='DAYS',
+                        help=f"days in the rolling average (default: {DEFAULT_ROLLING_DAYS})")
+    parser.add_argument('--weekly', action='store_true', help="also print completions per week")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args()
+
+    try:
+        until = date.fromisoformat(args.until) if args.until else date.today()
+        since = date.fromisoformat(args.since) if args.since else until - timedelta(days=89)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if since > until or args.rolling < 1:
+        print("❌ --since must not be after --until, and --rolling must be at least 1")
+        sys.exit(1)
+
+    # Configuration - Load from environment file
+    obsidian_path = get_obsidian_path()
+
+    # Verify obsidian directory exists
+    if not os.path.exists(obsidian_path):
+        print(f"❌ Obsidian directory not found: {obsidian_path}")
+        sys.exit(1)
+
+    vault = VaultSnapshot(obsidian_path)
+    stats = VelocityStats(since, until)
+
+    start = time.perf_counter()
+    for day, records in iter_note_records(vault, DailyArchive(vault), until.isoformat()):
+        stats.add_note(day, records)
+    vault.parse_cache.save()
+    elapsed = time.perf_counter() - start
+
+    wanted = {loose_key(link_target(name.strip('[]'))) for name in args.opportunity or []}
+    rows = []
+    for opportunity, counters in stats.by_opportunity.items():
+        if wanted and loose_key(link_target(opportunity)) not in wanted:
+            continue
+        rows.append((opportunity or NO_OPPORTUNITY, counters))
+    rows.sort(key=lambda row: (-row[1].completed, row[0]))
+    if args.top:
+        rows = rows[:args.top]
+    if not wanted:
+        rows.append(('All', stats.total()))
+
+    rows = [(name, stats.summary(counters, args.rolling), stats.weekly(counters, args.rolling) if args.weekly else None)
+            for name, counters in rows]
+
+    if args.json:
+        report = {
+            'since': since.isoformat(),
+            'until': until.isoformat(),
+            'rolling_days': args.rolling,
+            'opportunities': {name: dict(summary, weekly=series) if series is not None else summary
+                              for name, summary, series in rows},
+        }
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(stats, rows, args.rolling, args.weekly)
+    print(f"⏱️  {stats.notes_read} daily notes in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,83 +5,130 @@ Moves checked items from 00 Tracker.md to 01 Logger.md
 Converts "- [x] task - date" to "date - task"
 """
 
+import argparse
 import os
-import re
-from datetime import datetime
 from pathlib import Path
 import sys
-from config import get_obsidian_path
+from collections import Counter
+from config import get_obsidian_path, get_setting, get_float_setting
+from vault import VaultSnapshot
+from tombstones import TrackerTombstones, line_key
+from metrics import metrics, configure as configure_metrics
+from entry_index import CHECKED_TRACKER_LINE_PATTERN, LOGGER_ENTRY_PATTERN
+from logger_files import LoggerLayout
+from locks import lock_resources, LockTimeout, TRACKER, LOGGER
+
+# Files this stage reads and writes, for the pipeline scheduler and the run locks
+STAGE_READS = (TRACKER, LOGGER)
+STAGE_WRITES = (TRACKER, LOGGER)
+
+DEFAULT_COMPACT_THRESHOLD = 0.5
 
 
 class TaskLogger:
-    def __init__(self, obsidian_path):
+    def __init__(self, obsidian_path, vault=None, append_only=None, compact_threshold=None, logger_layout=None):
         self.obsidian_path = Path(obsidian_path)
         self.tracker_file = self.obsidian_path / "00 Tracker.md"
-        self.logger_file = self.obsidian_path / "01 Logger.md"
+        self.vault = vault if vault is not None else VaultSnapshot(obsidian_path)
+        
+        # One 01 Logger.md, or monthly files in 01 Logger/ (LOGGER_LAYOUT setting)
+        self.logger = LoggerLayout(self.vault, logger_layout)
+        
+        # Tracker storage mode: rewrite the tracker every run, or append tombstones and compact later
+        if append_only is None:
+            append_only = get_setting('TRACKER_MODE', 'rewrite').lower() == 'append'
+        if compact_threshold is None:
+            compact_threshold = get_float_setting('TRACKER_COMPACT_THRESHOLD', DEFAULT_COMPACT_THRESHOLD)
+        self.append_only = append_only
+        self.compact_threshold = compact_threshold
+        self.tombstones = TrackerTombstones(self.vault)
+        
+        # Filled in by parse_tracker_file
+        self.logged_keys = []
+        self.tracker_line_count = 0
     
     def parse_tracker_file(self):
-        """Parse tracker file and extract checked items"""
-        if not self.tracker_file.exists():
-            print("❌ 00 Tracker.md not found")
-            return [], []
+        """Stream the tracker line by line and extract checked items
         
-        try:
-            with open(self.tracker_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-        except Exception as e:
-            print(f"❌ Error reading 00 Tracker.md: {e}")
-            return [], []
+        Returns the new logger lines and the line numbers of the tracker
+        lines they came from; the rest of the tracker is never held in memory.
+        """
+        if not self.vault.file_exists(self.tracker_file):
+            print("❌ 00 Tracker.md not found")
+            return [], set()
         
         checked_items = []
-        updated_lines = []
+        logged_lines = set()
+        self.logged_keys = []
+        self.tracker_line_count = 0
+        dead_counts = Counter(self.tombstones.counts())
         
-        for line in lines:
-            original_line = line
-            line_content = line.rstrip()
-            
-            # Check for checked checkbox pattern: - [x] task text - date
-            checkbox_match = re.match(r'^- \[x\] (.+) - (\d{4}-\d{2}-\d{2})$', line_content)
-            if checkbox_match:
-                task_text = checkbox_match.group(1)
-                date = checkbox_match.group(2)
-                
-                # Create new format: date - task text
-                logged_item = f"{date} - {task_text}"
-                checked_items.append(logged_item)
+        try:
+            for line_no, line in enumerate(self.vault.iter_lines(self.tracker_file)):
+                self.tracker_line_count = line_no + 1
                 
-                # Skip adding this line to updated_lines (remove it)
-                continue
-            
-            # Keep all other lines
-            updated_lines.append(original_line)
+                # Only top-level checked entries are logged: - [x] task text - date
+                entry_match = CHECKED_TRACKER_LINE_PATTERN.match(line.rstrip())
+                if entry_match:
+                    # Lines with a tombstone were logged on an earlier run
+                    key = line_key(line)
+                    logged_lines.add(line_no)
+                    if dead_counts[key] > 0:
+                        dead_counts[key] -= 1
+                        continue
+                    
+                    task_text = entry_match.group(1)
+                    date = entry_match.group(2)
+                    
+                    # Create new format: date - task text
+                    logged_item = f"{date} - {task_text}"
+                    checked_items.append(logged_item)
+                    self.logged_keys.append(key)
+        except Exception as e:
+            print(f"❌ Error reading 00 Tracker.md: {e}")
+            return [], set()
         
-        return checked_items, updated_lines
+        metrics.count('items_extracted', len(checked_items))
+        return checked_items, logged_lines
     
-    def update_tracker_file(self, updated_lines):
-        """Update tracker file with checked items removed"""
+    def update_tracker_file(self, logged_lines):
+        """Update tracker file with checked items removed, streamed through a temp file on flush"""
         try:
-            with open(self.tracker_file, 'w', encoding='utf-8') as f:
-                f.writelines(updated_lines)
+            self.vault.rewrite_lines(self.tracker_file, logged_lines)
         except Exception as e:
             print(f"❌ Error updating 00 Tracker.md: {e}")
             return False
         return True
     
+    def dead_line_share(self, logged_lines):
+        """Share of tracker lines that have already been logged"""
+        if not self.tracker_line_count:
+            return 0.0
+        return len(logged_lines) / self.tracker_line_count
+    
+    def compact_tracker(self, logged_lines):
+        """Rewrite the tracker without its logged lines in one pass"""
+        if not self.update_tracker_file(logged_lines):
+            return False
+        self.tombstones.clear()
+        return True
+    
     def append_to_logger(self, checked_items):
         """Append checked items to logger file"""
         if not checked_items:
             return True
         
         try:
-            # Create logger file if it doesn't exist
-            if not self.logger_file.exists():
-                with open(self.logger_file, 'w', encoding='utf-8') as f:
-                    pass  # Create empty file
+            # Append new logged items (creates the logger file if it doesn't exist)
+            self.logger.append(checked_items)
+            metrics.count('items_appended', len(checked_items))
             
-            # Append new logged items
-            with open(self.logger_file, 'a', encoding='utf-8') as f:
-                for item in checked_items:
-                    f.write(f"{item}\n")
+            for item in checked_items:
+                entry_match = LOGGER_ENTRY_PATTERN.match(item)
+                if entry_match:
+                    logger_file = self.logger.file_for(entry_match.group(1))
+                    self.vault.history.add_logger_entry(entry_match.group(1), entry_match.group(2),
+                                                        logger_file.relative_to(self.obsidian_path).as_posix())
             
         except Exception as e:
             print(f"❌ Error updating 01 Logger.md: {e}")
@@ -89,36 +136,70 @@ class TaskLogger:
         
         return True
     
-    def process_tracker(self):
+    def process_tracker(self, force_compact=False):
         """Main processing function"""
         print("📄 Processing 00 Tracker.md")
         
         # Parse tracker file
-        checked_items, updated_lines = self.parse_tracker_file()
+        checked_items, logged_lines = self.parse_tracker_file()
         
         if not checked_items:
             print("ℹ️  No checked items found in tracker")
+            if force_compact and logged_lines:
+                if not self.compact_tracker(logged_lines):
+                    return False
+                print(f"🗜️  Compacted 00 Tracker.md")
             return True
         
         print(f"✅ Found {len(checked_items)} checked items:")
         for item in checked_items:
             print(f"   • {item}")
         
-        # Update tracker file (remove checked items)
-        if not self.update_tracker_file(updated_lines):
-            return False
-        
-        print(f"🔄 Updated 00 Tracker.md (removed checked items)")
-        
-        # Append to logger file
-        if not self.append_to_logger(checked_items):
-            return False
+        if self.append_only:
+            # Log first: tombstones are only staged for items whose logger append is staged
+            if not self.append_to_logger(checked_items):
+                return False
+            
+            # Record tombstones instead of rewriting the tracker, until enough of it is dead
+            self.tombstones.add(self.logged_keys)
+            dead_share = self.dead_line_share(logged_lines)
+            print(f"🪦 Marked {len(self.logged_keys)} tracker lines as logged ({dead_share:.0%} of tracker logged)")
+            
+            if force_compact or dead_share >= self.compact_threshold:
+                if not self.compact_tracker(logged_lines):
+                    return False
+                print(f"🗜️  Compacted 00 Tracker.md")
+        else:
+            # Update tracker file (remove checked items)
+            if not self.compact_tracker(logged_lines):
+                return False
+            
+            print(f"🔄 Updated 00 Tracker.md (removed checked items)")
+            
+            # Append to logger file
+            if not self.append_to_logger(checked_items):
+                return False
         
         print(f"📝 Added items to 01 Logger.md")
         return True
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Move checked items from 00 Tracker.md to 01 Logger.md")
+    parser.add_argument('--append-only', action='store_true', default=None,
+                        help="record logged items as tombstones instead of rewriting the tracker "
+                             "(default: TRACKER_MODE setting)")
+    parser.add_argument('--compact-threshold', type=float, metavar='SHARE',
+                        help="compact the tracker once this share of its lines is logged "
+                             f"(default: TRACKER_COMPACT_THRESHOLD setting or {DEFAULT_COMPACT_THRESHOLD})")
+    parser.add_argument('--compact', action='store_true',
+                        help="compact the tracker now")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="save a JSON report of timings and I/O counters (or set TASK_MANAGER_METRICS)")
+    parser.add_argument('--profile', metavar='DIR',
+                        help="save cProfile output to DIR (or set TASK_MANAGER_PROFILE)")
+    args = parser.parse_args()
+    
     # Configuration - Load from environment file
     obsidian_path = get_obsidian_path()
     
@@ -128,8 +209,17 @@ def main():
         sys.exit(1)
     
     # Run task logger
-    logger = TaskLogger(obsidian_path)
-    success = logger.process_tracker()
+    configure_metrics(args.metrics, args.profile)
+    try:
+        with lock_resources(obsidian_path, STAGE_READS + STAGE_WRITES):
+            logger = TaskLogger(obsidian_path, append_only=args.append_only,
+                                compact_threshold=args.compact_threshold)
+            with metrics.stage('task_logger'):
+                success = logger.process_tracker(force_compact=args.compact) and logger.vault.flush()
+    except LockTimeout as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    metrics.write_report()
     
     if success:
         print("✨ Task logging completed successfully!")
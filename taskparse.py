@@ -0,0 +1,116 @@
+"""
+Task Line Parser
+Shared parser for markdown checkbox lines ("- [ ] task" / "- [x] task")
+Every script uses the same precompiled patterns and indentation rule and
+works from the same compact task tree
+
+Indentation rule: a task is a child of the nearest task above it with a
+smaller indent (a tab counts as TAB_WIDTH columns), so tab, 4-space and
+2-space indented notes all give the same hierarchy. A non-blank line at
+column 0 that is not a task (a heading, paragraph or plain bullet) ends
+the current hierarchy.
+"""
+
+import re
+from note_index import link_target
+
+
+TAB_WIDTH = 4
+
+# Matched against a line with its indentation removed
+TASK_LINE_PATTERN = re.compile(r'- \[([ x])\]\s*(.*)')
+WIKILINK_PATTERN = re.compile(r'\[\[([^\]]+)\]\]')
+
+
+class TaskNode:
+    __slots__ = ('parent', 'depth', 'indent', 'checked', 'text', 'links', 'line_no')
+
+    def __init__(self, parent, indent, checked, text, line_no):
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.indent = indent
+        self.checked = checked
+        self.text = text
+        self.links = tuple(WIKILINK_PATTERN.findall(text)) if '[[' in text else ()
+        self.line_no = line_no
+
+    def ancestors(self):
+        """Return the task's parents, outermost first"""
+        chain = []
+        node = self.parent
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        chain.reverse()
+        return chain
+
+    def root(self):
+        """Return the top-level task this task belongs to"""
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def __repr__(self):
+        mark = 'x' if self.checked else ' '
+        return f"TaskNode(line={self.line_no}, depth={self.depth}, [{mark}] {self.text!r})"
+
+
+class TaskTree:
+    __slots__ = ('lines', 'nodes')
+
+    def __init__(self, lines, nodes):
+        self.lines = lines  # the parsed lines, unchanged
+        self.nodes = nodes  # every task in document order
+
+    def roots(self):
+        """Return the top-level tasks"""
+        return [node for node in self.nodes if node.parent is None]
+
+    def checked_line_numbers(self):
+        """Return the line numbers of all checked tasks"""
+        return {node.line_no for node in self.nodes if node.checked}
+
+
+def opportunity_link(node):
+    """The [[Opportunity]] a task is filed under: the note its top-level task links first, if that task starts at column 0
+
+    The link's |alias and #heading are dropped, so every form of a link
+    to one note files under the same opportunity.
+    """
+    root = node.root()
+    if root.indent == 0 and root.links:
+        return link_target(root.links[0])
+    return None
+
+
+def parse_tasks(lines):
+    """Parse markdown lines into a task tree"""
+    nodes = []
+    stack = []  # open tasks, outermost first
+    match_task = TASK_LINE_PATTERN.match
+
+    for line_no, line in enumerate(lines):
+        content = line.lstrip(' \t')
+        if not content or content.isspace():
+            continue
+
+        prefix_length = len(line) - len(content)
+        match = match_task(content)
+
+        if match is None:
+            # Headings and other top-level text close every open task
+            if prefix_length == 0:
+                stack.clear()
+            continue
+
+        indent = prefix_length + line.count('\t', 0, prefix_length) * (TAB_WIDTH - 1)
+        while stack and stack[-1].indent >= indent:
+            stack.pop()
+
+        parent = stack[-1] if stack else None
+        node = TaskNode(parent, indent, match.group(1) == 'x', match.group(2).strip(), line_no)
+        nodes.append(node)
+        stack.append(node)
+
+    return TaskTree(lines, nodes)
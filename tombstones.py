@@ -0,0 +1,47 @@
+"""
+Tracker Tombstones
+Append-only record of 00 Tracker.md lines that were already moved to the
+logger but are still in the tracker. Logging an item only appends a short
+key here instead of rewriting the tracker; the tracker is compacted in one
+pass once enough of it is dead.
+"""
+
+import hashlib
+from collections import Counter
+from vault import get_state_path
+
+
+TOMBSTONE_FILE = 'tracker_tombstones.txt'
+
+
+def line_key(line):
+    """Short key identifying a tracker line by its content"""
+    return hashlib.sha1(line.rstrip().encode('utf-8')).hexdigest()[:16]
+
+
+class TrackerTombstones:
+    def __init__(self, vault):
+        self.vault = vault
+        self.tombstone_file = get_state_path(vault.obsidian_path, TOMBSTONE_FILE)
+        self._counts = None
+
+    def counts(self):
+        """Return how many copies of each line key are dead"""
+        if self._counts is None:
+            self._counts = Counter()
+            if self.vault.file_exists(self.tombstone_file):
+                self._counts.update(self.vault.read_text(self.tombstone_file).split())
+        return self._counts
+
+    def add(self, keys):
+        """Append tombstones for newly logged lines, saved only if the logger write succeeds"""
+        if not keys:
+            return
+        self.counts().update(keys)
+        self.vault.append_state(self.tombstone_file, ''.join(f"{key}\n" for key in keys))
+
+    def clear(self):
+        """Drop every tombstone after the tracker was compacted"""
+        self._counts = Counter()
+        if self.vault.file_exists(self.tombstone_file):
+            self.vault.write_text(self.tombstone_file, "")
@@ -0,0 +1,451 @@
+"""
+Vault Snapshot
+Scans the Obsidian vault once and caches file contents in memory so the
+task manager stages can share them. Writes are staged and only hit the
+disk when flush() is called, so each touched file is written once per run.
+Full rewrites go to a temporary file that replaces the original in one
+step, so a crash mid-write never leaves a truncated file behind.
+Stages running in parallel threads share one snapshot, so its staged
+writes and caches are only touched with its lock held.
+"""
+
+import io
+import os
+import shutil
+import threading
+from pathlib import Path
+from metrics import metrics
+from taskparse import parse_tasks
+from daily_index import DailyNoteIndex, DAILY_FILE_PATTERN
+from note_index import NoteIndex, NOTE_SUFFIX
+from parse_cache import ParseCache, MISSING, DEFAULT_MAX_MB, content_hash
+from history_index import HistoryIndex, HISTORY_DB
+from link_index import LinkIndex, LINK_INDEX_FILE
+from config import get_float_setting
+
+
+# Hidden folder inside the vault for checkpoints, caches and indexes
+STATE_DIR_NAME = '.task-manager'
+
+
+def get_state_path(obsidian_path, filename):
+    """Get the path of a state file kept inside the vault"""
+    return Path(obsidian_path) / STATE_DIR_NAME / filename
+
+
+DAILY_INDEX_FILE = 'daily_index.json'
+PARSE_CACHE_FILE = 'parse_cache.bin'
+
+
+class VaultSnapshot:
+    def __init__(self, obsidian_path):
+        self.obsidian_path = Path(obsidian_path)
+        self._daily_index = None
+        self._note_index = None
+        self._parse_cache = None
+        self._history = None
+        self._link_index = None
+        self._lock = threading.RLock()  # guards staged writes, cached content and lazy setup for parallel stages
+        self._contents = {}  # {Path: text read from disk}
+        self._read_stats = {}  # {Path: (mtime_ns, size) of the file when its content was read}
+        self._staged = {}  # {Path: (replace, [chunks])} written or appended on flush
+        self._rewrites = {}  # {Path: line numbers to drop} streamed through a temp file on flush
+        self._state_files = set()  # staged paths written last, and only if the rest of the flush succeeded
+        self._trees = {}  # {Path: parsed TaskTree}
+
+    def exists(self):
+        """Check that the vault directory itself exists"""
+        return self.obsidian_path.is_dir()
+
+    @property
+    def daily_index(self):
+        """The vault's daily note index, loaded from its on-disk cache on first use"""
+        with self._lock:
+            if self._daily_index is None:
+                cache_file = get_state_path(self.obsidian_path, DAILY_INDEX_FILE)
+                self._daily_index = DailyNoteIndex(self.obsidian_path, cache_file).load()
+        return self._daily_index
+
+    @property
+    def note_index(self):
+        """Name-to-path index of every note in the vault, scanned on first use"""
+        with self._lock:
+            if self._note_index is None:
+                self._note_index = NoteIndex(self.obsidian_path).scan()
+        return self._note_index
+
+    @property
+    def parse_cache(self):
+        """Stage results cached per note on disk, loaded on first use"""
+        with self._lock:
+            if self._parse_cache is None:
+                max_mb = get_float_setting('PARSE_CACHE_MAX_MB', DEFAULT_MAX_MB)
+                cache_file = get_state_path(self.obsidian_path, PARSE_CACHE_FILE)
+                self._parse_cache = ParseCache(cache_file, int(max_mb * 1024 * 1024)).load()
+        return self._parse_cache
+
+    @property
+    def history(self):
+        """SQLite index of logged items; rows staged on it are committed by flush()"""
+        with self._lock:
+            if self._history is None:
+                self._history = HistoryIndex(get_state_path(self.obsidian_path, HISTORY_DB))
+        return self._history
+
+    @property
+    def link_index(self):
+        """Every [[link]] in the daily notes, loaded from disk on first use; refresh() before querying"""
+        with self._lock:
+            if self._link_index is None:
+                self._link_index = LinkIndex(get_state_path(self.obsidian_path, LINK_INDEX_FILE)).load()
+        return self._link_index
+
+    def _index_new_note(self, path):
+        # Notes created during the run resolve like the ones already on disk
+        if self._note_index is not None and path.suffix == NOTE_SUFFIX and self.obsidian_path in path.parents:
+            self._note_index.add(path)
+
+    def daily_file_path(self, date):
+        """Return the path of the daily note for a YYYY-MM-DD date"""
+        return self.obsidian_path / f"{date}.md"
+
+    def daily_files(self):
+        """Return all YYYY-MM-DD.md files in the vault root, newest first"""
+        with self._lock:
+            return [self.daily_file_path(date) for date in reversed(self.daily_index.dates)]
+
+    def daily_files_since(self, date):
+        """Return the daily files dated on or after date, newest first"""
+        with self._lock:
+            return [self.daily_file_path(date) for date in reversed(self.daily_index.since(date))]
+
+    def latest_daily_file(self):
+        """Return the newest daily file, or None if there are none"""
+        with self._lock:
+            latest = self.daily_index.latest()
+            return self.daily_file_path(latest) if latest else None
+
+    def file_exists(self, path):
+        """Check if a file exists on disk or has a staged write"""
+        path = Path(path)
+        with self._lock:
+            return path in self._staged or path in self._contents or path.exists()
+
+    def _disk_text(self, path):
+        with self._lock:
+            if path not in self._contents:
+                with open(path, 'r', encoding='utf-8') as f:
+                    stat = os.fstat(f.fileno())
+                    self._contents[path] = f.read()
+                    self._read_stats[path] = (stat.st_mtime_ns, stat.st_size)
+                    metrics.count('files_opened')
+                    metrics.count('bytes_read', stat.st_size)
+            return self._contents[path]
+
+    def read_text(self, path):
+        """Read a file once and serve later reads (and staged writes) from memory"""
+        path = Path(path)
+        with self._lock:
+            if path in self._rewrites:
+                return ''.join(self.iter_lines(path))
+
+            staged = self._staged.get(path)
+            if staged is None:
+                return self._disk_text(path)
+
+            replace, chunks = staged
+            if len(chunks) > 1:
+                chunks[:] = [''.join(chunks)]
+            staged_text = chunks[0] if chunks else ''
+            if replace:
+                return staged_text
+
+            base = self._disk_text(path) if path in self._contents or path.exists() else ''
+            return base + staged_text
+
+    def iter_lines(self, path):
+        """Yield a file's lines as the run sees them, streaming from disk if it isn't in memory"""
+        path = Path(path)
+        with self._lock:
+            drop = self._rewrites.get(path)
+        if drop is None:
+            yield from self._iter_view(path)
+            return
+
+        for line_no, line in enumerate(self._iter_view(path)):
+            if line_no not in drop:
+                yield line
+
+    def _iter_view(self, path):
+        # Staged and cached text is taken under the lock; only a file on disk streams without it
+        with self._lock:
+            replace, chunks = self._staged.get(path, (False, []))
+            staged_text = ''.join(chunks)
+            text = None if replace else self._contents.get(path)
+        if not replace:
+            if text is not None:
+                yield from io.StringIO(text)
+            elif path.exists():
+                metrics.count('files_opened')
+                with open(path, 'r', encoding='utf-8') as f:
+                    yield from f
+        yield from io.StringIO(staged_text)
+
+    def read_lines(self, path):
+        """Read a file as a list of lines, like file.readlines()"""
+        return io.StringIO(self.read_text(path)).readlines()
+
+    def read_tasks(self, path):
+        """Parse a file's tasks once and share the tree between stages"""
+        path = Path(path)
+        with self._lock:
+            if path not in self._trees:
+                self._trees[path] = parse_tasks(self.read_lines(path))
+                metrics.count('lines_parsed', len(self._trees[path].lines))
+            return self._trees[path]
+
+    def cached_parse(self, path, kind, extract):
+        """Return extract(task tree) for a file, from the parse cache if the file is unchanged
+
+        kind names the stage's result in the cache, so stages reading the
+        same note keep separate entries under one key.
+        """
+        path = Path(path)
+        with self._lock:
+            if path in self._staged or not self.parse_cache.enabled:
+                return extract(self.read_tasks(path))
+
+            stat = os.stat(path)
+            name = path.relative_to(self.obsidian_path).as_posix()
+            result = self.parse_cache.lookup(name, stat.st_mtime_ns, stat.st_size, kind)
+            if result is not MISSING:
+                metrics.count('parse_cache_hits')
+                return result
+
+            digest = content_hash(self.read_text(path))
+            result = self.parse_cache.lookup_hash(name, digest, stat.st_mtime_ns, stat.st_size, kind)
+            if result is not MISSING:
+                metrics.count('parse_cache_hits')
+                return result
+
+            metrics.count('parse_cache_misses')
+            result = extract(self.read_tasks(path))
+            self.parse_cache.store(name, stat.st_mtime_ns, stat.st_size, digest, kind, result)
+            return result
+
+    def cached_result(self, path, kind):
+        """Return (result, state) for an unchanged file from the parse cache without reading it
+
+        state is the file's (mtime_ns, size, content hash) the result belongs
+        to; result is MISSING (and state None) if the cache has no entry.
+        """
+        path = Path(path)
+        if path in self._staged or not self.parse_cache.enabled:
+            return MISSING, None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return MISSING, None
+        name = path.relative_to(self.obsidian_path).as_posix()
+        result = self.parse_cache.lookup(name, stat.st_mtime_ns, stat.st_size, kind)
+        digest = self.parse_cache.cached_hash(name, stat.st_mtime_ns, stat.st_size)
+        if result is MISSING or digest is None:
+            return MISSING, None
+        metrics.count('parse_cache_hits')
+        return result, (stat.st_mtime_ns, stat.st_size, digest)
+
+    def file_state(self, path):
+        """(mtime_ns, size, content hash) of a file as this run sees it
+
+        The stat is never newer than the content the hash was taken from, so
+        a file edited after it was read still looks changed next to a
+        checkpoint recorded from this. The hash comes from the parse cache if
+        the file is unchanged there.
+        """
+        path = Path(path)
+        with self._lock:
+            stat = os.stat(path)
+            if path not in self._staged and path not in self._contents and self.parse_cache.enabled:
+                name = path.relative_to(self.obsidian_path).as_posix()
+                digest = self.parse_cache.cached_hash(name, stat.st_mtime_ns, stat.st_size)
+                if digest is not None:
+                    return stat.st_mtime_ns, stat.st_size, digest
+            digest = content_hash(self.read_text(path))
+            mtime_ns, size = self._read_stats.get(path, (stat.st_mtime_ns, stat.st_size))
+            return mtime_ns, size, digest
+
+    def store_result(self, path, kind, result, digest, mtime_ns, size):
+        """Cache a result computed elsewhere (e.g. in a worker process) for a file's content"""
+        path = Path(path)
+        with self._lock:
+            if path in self._staged:
+                return
+            metrics.count('parse_cache_misses')
+            name = path.relative_to(self.obsidian_path).as_posix()
+            self.parse_cache.store(name, mtime_ns, size, digest, kind, result)
+
+    def write_text(self, path, content):
+        """Stage the full content of a file to be written on flush"""
+        path = Path(path)
+        with self._lock:
+            self._staged[path] = (True, [content])
+            self._rewrites.pop(path, None)
+            self._trees.pop(path, None)
+            self._index_new_note(path)
+
+            # Keep the daily file listing in step with newly created daily notes
+            if (self._daily_index is not None and path.parent == self.obsidian_path
+                    and DAILY_FILE_PATTERN.match(path.name)):
+                self._daily_index.add(path.stem)
+
+    def write_state(self, path, content):
+        """Stage a state file (checkpoint, line state) that records what this run's writes contain
+
+        It is written after every other staged file and skipped if any of
+        them failed, so the next run redoes the work instead of trusting a
+        record of output that never reached the disk.
+        """
+        with self._lock:
+            self.write_text(path, content)
+            self._state_files.add(Path(path))
+
+    def append_state(self, path, content):
+        """Stage content to be appended to a state file, held back like write_state() if a write fails"""
+        with self._lock:
+            self.append_text(path, content)
+            self._state_files.add(Path(path))
+
+    def rewrite_lines(self, path, drop_line_numbers):
+        """Stage a rewrite of a file without the given line numbers (0-based, as iter_lines yields them)
+
+        The file is streamed through a temporary file on flush, so memory
+        use doesn't depend on the file size.
+        """
+        path = Path(path)
+        with self._lock:
+            replace, _ = self._staged.get(path, (False, []))
+            if replace or path in self._rewrites:
+                # Already in memory: filter it there
+                lines = self.read_lines(path)
+                self.write_text(path, ''.join(line for line_no, line in enumerate(lines)
+                                              if line_no not in drop_line_numbers))
+                return
+
+            self._staged.setdefault(path, (False, []))
+            self._rewrites[path] = set(drop_line_numbers)
+            self._trees.pop(path, None)
+
+    def append_text(self, path, content):
+        """Stage content to be appended to a file on flush
+
+        The existing file is not read: on flush only the new content is
+        appended, so the cost depends on what was added, not on the file size.
+        """
+        path = Path(path)
+        with self._lock:
+            if path not in self._staged:
+                self._staged[path] = (False, [])
+            self._staged[path][1].append(content)
+            self._trees.pop(path, None)
+            self._index_new_note(path)
+
+    def has_staged_write(self, path):
+        """Check if a file has a staged write that isn't on disk yet"""
+        with self._lock:
+            return Path(path) in self._staged
+
+    def invalidate(self, path):
+        """Forget the cached content of a file that changed on disk"""
+        path = Path(path)
+        with self._lock:
+            self._contents.pop(path, None)
+            self._read_stats.pop(path, None)
+            self._trees.pop(path, None)
+
+            if (self._daily_index is not None and path.parent == self.obsidian_path
+                    and DAILY_FILE_PATTERN.match(path.name)):
+                if path.exists():
+                    self._daily_index.add(path.stem)
+                else:
+                    self._daily_index.discard(path.stem)
+
+    def pending_files(self):
+        """Return the files that have staged writes"""
+        with self._lock:
+            return list(self._staged)
+
+    def _write_atomic(self, path, pieces):
+        """Write pieces of text to a temporary file, then move it over path in one step"""
+        temp_path = path.with_name(f".{path.name}.tmp")
+        written = 0
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for piece in pieces:
+                    f.write(piece)
+                    if metrics.enabled:
+                        written += len(piece.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            if path.exists():
+                shutil.copymode(path, temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        metrics.count('bytes_written', written)
+
+    def flush(self):
+        """Write every staged file to disk exactly once"""
+        with self._lock:
+            success = True
+
+            # State files go last so they can be held back if a content write failed
+            paths = sorted(self._staged, key=lambda path: path in self._state_files)
+            for path in paths:
+                replace, chunks = self._staged[path]
+                if path in self._state_files and not success:
+                    print(f"⚠️  Not saving {path.name} because a write failed; the next run will redo the work")
+                    continue
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    if path in self._rewrites:
+                        self._write_atomic(path, self.iter_lines(path))
+                        self._contents.pop(path, None)
+                        self._read_stats.pop(path, None)
+                    elif replace:
+                        content = ''.join(chunks)
+                        self._write_atomic(path, [content])
+                        self._contents[path] = content
+                        self._read_stats.pop(path, None)
+                    else:
+                        content = ''.join(chunks)
+                        with open(path, 'a', encoding='utf-8') as f:
+                            f.write(content)
+                        if metrics.enabled:
+                            metrics.count('bytes_written', len(content.encode('utf-8')))
+                        if path in self._contents:
+                            self._contents[path] += content
+                    metrics.count('files_written')
+                except Exception as e:
+                    print(f"❌ Error writing {path.name}: {e}")
+                    success = False
+
+            self._staged.clear()
+            self._rewrites.clear()
+            self._state_files.clear()
+            if self._parse_cache is not None:
+                self._parse_cache.save()
+            if self._link_index is not None:
+                self._link_index.save()
+
+            # Index the logged items only once their markdown is on disk
+            if self._history is not None and self._history.pending:
+                if success:
+                    self._history.commit()
+                else:
+                    self._history.discard()
+                    print("⚠️  History index skipped this run's items; run `python query.py --rebuild`")
+            return success
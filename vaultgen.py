@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Synthetic Vault Generator
+Builds a seeded, reproducible Obsidian vault for benchmarks and tests:
+daily notes with nested [[Opportunity]] tasks, opportunity notes,
+00 Tracker.md and 01 Logger.md
+"""
+
+import argparse
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+
+DEFAULTS = {
+    'days': 365,
+    'tasks_per_day': 20,
+    'max_depth': 3,
+    'opportunities': 25,
+    'space_indent_ratio': 0.2,
+    'checked_ratio': 0.4,
+    'tracker_lines': 500,
+    'logger_lines': 5000,
+    'seed': 0,
+    'start_date': '2020-01-01',
+}
+
+WORDS = [
+    'review', 'draft', 'call', 'email', 'update', 'spec', 'budget', 'plan',
+    'deck', 'contract', 'follow', 'up', 'with', 'team', 'client', 'notes',
+    'schedule', 'meeting', 'proposal', 'invoice', 'demo', 'fix', 'report',
+]
+
+
+def random_text(rng, words=3):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, words))).capitalize()
+
+
+def daily_note_lines(rng, opportunities, tasks_per_day, max_depth, indent_unit, checked_ratio):
+    """Build the lines of one daily note"""
+    lines = ["# Tasks\n", "\n"]
+    remaining = tasks_per_day
+
+    while remaining > 0:
+        opportunity = rng.choice(opportunities)
+        lines.append(f"- [ ] [[{opportunity}]]\n")
+        remaining -= 1
+
+        depth = 1
+        for _ in range(min(remaining, rng.randint(1, 6))):
+            depth = rng.randint(1, min(depth + 1, max_depth)) if max_depth > 0 else 0
+            mark = 'x' if rng.random() < checked_ratio else ' '
+            lines.append(f"{indent_unit * depth}- [{mark}] {random_text(rng)}\n")
+            remaining -= 1
+
+    lines.append("\n")
+    lines.append("Notes for the day.\n")
+    return lines
+
+
+def generate_vault(path, days=DEFAULTS['days'], tasks_per_day=DEFAULTS['tasks_per_day'],
+                   max_depth=DEFAULTS['max_depth'], opportunities=DEFAULTS['opportunities'],
+                   space_indent_ratio=DEFAULTS['space_indent_ratio'],
+                   checked_ratio=DEFAULTS['checked_ratio'], tracker_lines=DEFAULTS['tracker_lines'],
+                   logger_lines=DEFAULTS['logger_lines'], seed=DEFAULTS['seed'],
+                   start_date=DEFAULTS['start_date']):
+    """Write a synthetic vault to path and return the list of daily note paths"""
+    rng = random.Random(seed)
+    vault_path = Path(path)
+    vault_path.mkdir(parents=True, exist_ok=True)
+
+    opportunity_names = [f"Opportunity {number}" for number in range(max(1, opportunities))]
+    first_day = date.fromisoformat(start_date)
+
+    daily_files = []
+    for offset in range(days):
+        day = (first_day + timedelta(days=offset)).isoformat()
+        if rng.random() < space_indent_ratio:
+            indent_unit = ' ' * rng.choice([2, 4])
+        else:
+            indent_unit = '\t'
+
+        lines = daily_note_lines(rng, opportunity_names, tasks_per_day, max_depth, indent_unit, checked_ratio)
+        daily_file = vault_path / f"{day}.md"
+        daily_file.write_text(''.join(lines), encoding='utf-8')
+        daily_files.append(daily_file)
+
+    # Existing opportunity notes for half of the opportunities
+    for name in opportunity_names[::2]:
+        content = [f"# {name}\n", "\n", f"## Completed Activities - {start_date}\n"]
+        content.extend(f"- [ ] {random_text(rng)}\n" for _ in range(rng.randint(1, 10)))
+        (vault_path / f"{name}.md").write_text(''.join(content), encoding='utf-8')
+
+    last_day = first_day + timedelta(days=max(days - 1, 0))
+
+    def random_day():
+        return (first_day + timedelta(days=rng.randint(0, max(days - 1, 0)))).isoformat()
+
+    tracker = ["# Task Tracker\n", "\n"]
+    for _ in range(tracker_lines):
+        mark = 'x' if rng.random() < checked_ratio else ' '
+        tracker.append(f"- [{mark}] [[{rng.choice(opportunity_names)}]] - {random_text(rng)} - {random_day()}\n")
+    (vault_path / "00 Tracker.md").write_text(''.join(tracker), encoding='utf-8')
+
+    logger = [f"{random_day()} - [[{rng.choice(opportunity_names)}]] - {random_text(rng)}\n"
+              for _ in range(logger_lines)]
+    logger.sort()
+    (vault_path / "01 Logger.md").write_text(''.join(logger), encoding='utf-8')
+
+    print(f"🧪 Generated {days} daily notes ({first_day} to {last_day}) in {vault_path}")
+    return daily_files
+
+
+def add_generator_arguments(parser):
+    """Add the generator's options to an argparse parser"""
+    parser.add_argument('--days', type=int, default=DEFAULTS['days'])
+    parser.add_argument('--tasks-per-day', type=int, default=DEFAULTS['tasks_per_day'])
+    parser.add_argument('--max-depth', type=int, default=DEFAULTS['max_depth'])
+    parser.add_argument('--opportunities', type=int, default=DEFAULTS['opportunities'])
+    parser.add_argument('--space-indent-ratio', type=float, default=DEFAULTS['space_indent_ratio'],
+                        help="share of daily notes indented with spaces instead of tabs")
+    parser.add_argument('--checked-ratio', type=float, default=DEFAULTS['checked_ratio'])
+    parser.add_argument('--tracker-lines', type=int, default=DEFAULTS['tracker_lines'])
+    parser.add_argument('--logger-lines', type=int, default=DEFAULTS['logger_lines'])
+    parser.add_argument('--seed', type=int, default=DEFAULTS['seed'])
+    parser.add_argument('--start-date', default=DEFAULTS['start_date'])
+
+
+def generator_options(args):
+    """Collect generate_vault keyword arguments from parsed arguments"""
+    return {key: getattr(args, key) for key in DEFAULTS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Obsidian vault")
+    parser.add_argument('path', help="directory to create the vault in")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+
+    generate_vault(args.path, **generator_options(args))
+
+
+if __name__ == "__main__":
+    main()
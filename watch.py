@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Watch Mode
+Keeps running and processes vault changes as they happen
+- Saving the latest daily note runs deeplogging for the newly checked items
+- Editing 00 Tracker.md runs task_logger
+Uses inotify on Linux and falls back to polling file mtimes elsewhere.
+Bursts of saves are debounced, and the vault snapshot, parsed notes and
+indexes stay in memory between changes.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from config import get_obsidian_path
+from vault import VaultSnapshot
+from daily_index import DAILY_FILE_PATTERN
+from deeplogging import TaskTracker
+from task_logger import TaskLogger
+from locks import lock_resources, LockTimeout, DAILY_NOTES, TRACKER, LOGGER
+
+
+TRACKER_NAME = "00 Tracker.md"
+
+# The files the deeplogging and task_logger stages use, locked while a batch is processed
+LOCKED_RESOURCES = (DAILY_NOTES, TRACKER, LOGGER)
+
+
+def is_watched_name(name):
+    return name == TRACKER_NAME or bool(DAILY_FILE_PATTERN.match(name))
+
+
+class InotifyWatcher:
+    """Reports changed file names in a directory through Linux inotify"""
+
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_DELETE = 0x200
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directory):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError("inotify is not available on this platform")
+
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_FROM | self.IN_MOVED_TO | self.IN_DELETE
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def read_changes(self, timeout):
+        """Wait up to timeout seconds (None: forever) and return the changed file names"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        names = set()
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += length
+            if is_watched_name(name):
+                names.add(name)
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Reports changed file names by comparing mtimes and sizes between scans"""
+
+    def __init__(self, directory, interval=1.0):
+        self.directory = Path(directory)
+        self.interval = interval
+        self.state = self._scan()
+
+    def _scan(self):
+        state = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if is_watched_name(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    state[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def read_changes(self, timeout):
+        """Wait up to timeout seconds (None: one poll interval) and return the changed file names"""
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        new_state = self._scan()
+        changed = {name for name in new_state.keys() | self.state.keys()
+                   if new_state.get(name) != self.state.get(name)}
+        self.state = new_state
+        return changed
+
+    def close(self):
+        pass
+
+
+def create_watcher(directory, use_polling=False, poll_interval=1.0):
+    """Use inotify where it works, otherwise fall back to polling"""
+    if not use_polling:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print(f"ℹ️  inotify unavailable ({e}), polling every {poll_interval}s")
+    return PollingWatcher(directory, poll_interval)
+
+
+class VaultWatchSession:
+    """Warm state kept between changes: the vault snapshot and its indexes"""
+
+    def __init__(self, obsidian_path):
+        self.vault = VaultSnapshot(obsidian_path)
+        self.tracker = TaskTracker(obsidian_path, self.vault)
+        self.logger = TaskLogger(obsidian_path, self.vault)
+        self.own_writes = {}  # {path: (mtime_ns, size)} of files this session wrote
+
+    def _is_own_write(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return self.own_writes.get(path) == (stat.st_mtime_ns, stat.st_size)
+
+    def handle_daily_note(self, path):
+        """Run deeplogging for the newly checked items in the latest daily note"""
+        if path != self.vault.latest_daily_file() or not path.exists():
+            return
+
+        checked_items = self.vault.cached_parse(path, 'checked_items', self.tracker.extract_checked_items)
+        new_items = self.tracker.filter_new_items(checked_items, path.stem)
+        if not new_items:
+            return
+
+        print(f"✅ {path.name}: {len(new_items)} newly checked items")
+        for item in new_items:
+            print(f"   • {item}")
+        self.tracker.create_or_update_tracker(new_items, path.stem)
+
+    def handle_tracker(self):
+        """Run task_logger after the tracker was edited"""
+        self.logger.process_tracker()
+
+    def process_changes(self, names):
+        """Process one debounced batch of changed file names"""
+        paths = [self.vault.obsidian_path / name for name in sorted(names)]
+        paths = [path for path in paths if not self._is_own_write(path)]
+        if not paths:
+            return
+
+        start = time.perf_counter()
+        try:
+            with lock_resources(self.vault.obsidian_path, LOCKED_RESOURCES):
+                self._process_locked(paths)
+        except LockTimeout as e:
+            print(f"⚠️  Skipped {', '.join(path.name for path in paths)}: {e}")
+            return
+
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"⏱️  Processed {', '.join(path.name for path in paths)} in {elapsed:.1f}ms")
+
+    def _process_locked(self, paths):
+        for path in paths:
+            self.vault.invalidate(path)
+            if path.name == TRACKER_NAME:
+                self.tracker.reset_entry_index()
+        # Another run may have rewritten the tracker while this one waited for the lock
+        self.vault.invalidate(self.tracker.tracker_file)
+
+        # Daily notes first: deeplogging appends to the tracker that task_logger reads
+        for path in paths:
+            if path.name != TRACKER_NAME:
+                self.handle_daily_note(path)
+        if any(path.name == TRACKER_NAME for path in paths):
+            self.handle_tracker()
+
+        written_files = self.vault.pending_files()
+        self.vault.flush()
+        for path in written_files:
+            try:
+                stat = os.stat(path)
+                self.own_writes[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                pass
+
+
+def watch(obsidian_path, debounce=0.5, use_polling=False, poll_interval=1.0):
+    """Watch the vault until interrupted"""
+    session = VaultWatchSession(obsidian_path)
+    watcher = create_watcher(obsidian_path, use_polling, poll_interval)
+    print(f"👀 Watching {obsidian_path} (Ctrl+C to stop)")
+
+    try:
+        while True:
+            changed = watcher.read_changes(None)
+            if not changed:
+                continue
+
+            # Debounce: keep collecting until the vault has been quiet for a moment
+            while True:
+                more = watcher.read_changes(debounce)
+                if not more:
+                    break
+                changed |= more
+
+            session.process_changes(changed)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process daily note and tracker changes as they happen")
+    parser.add_argument('--debounce', type=float, default=0.5, metavar='SECONDS',
+                        help="wait this long after the last save before processing (default: 0.5)")
+    parser.add_argument('--poll', action='store_true',
+                        help="poll file mtimes instead of using inotify")
+    parser.add_argument('--poll-interval', type=float, default=1.0, metavar='SECONDS',
+                        help="seconds between polls when polling (default: 1.0)")
+    args = parser.parse_args()
+
+    # Configuration - Load from environment file
+    obsidian_path = get_obsidian_path()
+
+    # Verify obsidian directory exists
+    if not os.path.exists(obsidian_path):
+        print(f"❌ Obsidian directory not found: {obsidian_path}")
+        sys.exit(1)
+
+    watch(obsidian_path, args.debounce, args.poll, args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()